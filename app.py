@@ -1,92 +1,942 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
+import argparse
+import bisect
 import csv
+import json
+import operator
 import os
+import queue
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from gpa_engine import GpaEngine
+
+
+class StringDictionary:
+    """Dictionary encoding for a repetitive text field.
+
+    Every distinct value is stored once and gets a small integer code.
+    Values that only differ by case share a fold code, so case-insensitive
+    comparisons become integer comparisons.
+    """
+
+    def __init__(self):
+        self.codes = {}  # {value: code}
+        self.values = []  # [value] indexed by code
+        self.fold_codes = {}  # {value.lower(): fold code}
+        self.folds = []  # [fold code] indexed by code
+        self.bytes_released = 0  # size of the duplicate strings released
+
+    def encode(self, value):
+        """Return the code of a value, adding it if it is new."""
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+            self.folds.append(self.fold_codes.setdefault(value.lower(), len(self.fold_codes)))
+        elif self.values[code] is not value:
+            self.bytes_released += sys.getsizeof(value)
+        return code
+
+    def intern(self, value):
+        """Return the single shared copy of a value."""
+        return self.values[self.encode(value)]
+
+    def overhead(self):
+        """Bytes taken by the code tables themselves."""
+        return sum(sys.getsizeof(table) for table in (self.codes, self.values, self.fold_codes, self.folds))
+
+    def fold_of(self, value):
+        """Fold code of a value, or -1 if no value matches it ignoring case."""
+        return self.fold_codes.get(value.lower(), -1)
+
+
+class RowValidator:
+    """One-pass integrity checks for loaded and imported rows.
+
+    Hash indexes on student_id and phone catch duplicates in O(1) per row.
+    Bad rows are collected in rejects instead of failing the whole file.
+    IDs in archived_ids belong to archived students and can't be reused.
+    """
+
+    def __init__(self, student_ids=(), phones=None, archived_ids=()):
+        self.student_ids = set(student_ids)
+        self.archived_ids = archived_ids
+        self.phones = dict(phones or {})  # {phone: student_id}
+        self.rejects = []  # [(source, line number, reason, row)]
+        self.rows_checked = 0
+        self.seconds = 0.0
+
+    def check_student(self, source, line, row):
+        """Return a typed student row, or None after recording why it was rejected."""
+        started = time.perf_counter()
+        self.rows_checked += 1
+        reason = None
+        if len(row) < 5:  # Ensure we have all required fields
+            reason = "missing fields"
+        else:
+            student_id, name, age, course, phone = row[:5]
+            if not student_id:
+                reason = "empty student_id"
+            elif student_id in self.student_ids:
+                reason = "duplicate student_id"
+            elif student_id in self.archived_ids:
+                reason = "student_id belongs to an archived student"
+            elif phone and phone in self.phones:
+                reason = f"phone already used by student {self.phones[phone]}"
+            else:
+                try:
+                    age = int(age)
+                    if age <= 0:
+                        raise ValueError
+                except ValueError:
+                    reason = "invalid age"
+        if reason is None:
+            self.student_ids.add(student_id)
+            if phone:
+                self.phones[phone] = student_id
+        else:
+            self.rejects.append((source, line, reason, row))
+        self.seconds += time.perf_counter() - started
+        return None if reason else (student_id, name, age, course, phone)
+
+    def check_module(self, source, line, row):
+        """Return a typed module row, or None after recording why it was rejected."""
+        started = time.perf_counter()
+        self.rows_checked += 1
+        reason = None
+        if len(row) < 3:  # Ensure we have all required fields
+            reason = "missing fields"
+        else:
+            student_id, module_name, grade = row[:3]
+            if student_id not in self.student_ids:
+                reason = "unknown student_id"
+            elif not module_name.strip():
+                reason = "empty module name"
+            else:
+                try:
+                    grade = float(grade)
+                    if not (0 <= grade <= 100):
+                        raise ValueError
+                except ValueError:
+                    reason = "invalid grade"
+        if reason is not None:
+            self.rejects.append((source, line, reason, row))
+        self.seconds += time.perf_counter() - started
+        return None if reason else (student_id, module_name, grade)
+
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class Predicate:
+    """Base class of query predicates; combine them with & and |."""
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def matches(self, db, student_id):
+        """Check whether one student satisfies the predicate."""
+        raise NotImplementedError
+
+    def access_path(self, db):
+        """(index name, estimated rows, fetch) if an index can answer this, else None."""
+        return None
+
+    def describe(self):
+        """Readable form used by explain()."""
+        raise NotImplementedError
+
+
+class Where(Predicate):
+    """Compare a student field (id, name, age, course, phone or gpa) with a value."""
+
+    FIELDS = {"name": 0, "age": 1, "course": 2, "phone": 3}
+
+    def __init__(self, field, op, value):
+        if field not in self.FIELDS and field not in ("id", "gpa"):
+            raise ValueError(f"Unknown field '{field}'")
+        if op not in OPERATORS and op != "contains":
+            raise ValueError(f"Unknown operator '{op}'")
+        self.field = field
+        self.op = op
+        self.value = value
+
+    def matches(self, db, student_id):
+        if self.field == "id":
+            actual = student_id
+        elif self.field == "gpa":
+            actual = db.calculate_gpa(student_id)
+        else:
+            actual = db.students[student_id][self.FIELDS[self.field]]
+
+        if self.op == "contains":
+            return str(self.value).lower() in str(actual).lower()
+        if self.field == "course" and self.op in ("==", "!="):
+            # Courses compare ignoring case, through their fold codes
+            same = db.courses.folds[db.course_codes[student_id]] == db.courses.fold_of(self.value)
+            return same if self.op == "==" else not same
+        return OPERATORS[self.op](actual, self.value)
+
+    def access_path(self, db):
+        if self.field == "id" and self.op == "==":
+            found = [self.value] if self.value in db.students else []
+            return "id", len(found), lambda: found
+        if self.field == "course" and self.op == "==":
+            members = db.course_index.get(db.courses.fold_of(self.value), {})
+            return "course", len(members), lambda: list(members)
+        if self.field == "gpa" and self.op in OPERATORS and self.op != "!=":
+            # The GPA ordering is only built if this path is actually used
+            return ("gpa order", db.estimate_gpa_range(self.op, self.value),
+                    lambda: db.get_gpa_range(self.op, self.value))
+        return None
+
+    def describe(self):
+        return f"{self.field} {self.op} {self.value!r}"
+
+
+class TookModule(Predicate):
+    """The student took a module, optionally with a grade compared to a value."""
+
+    def __init__(self, module_name, op=None, grade=None):
+        if op is not None and op not in OPERATORS:
+            raise ValueError(f"Unknown operator '{op}'")
+        self.module_name = module_name
+        self.op = op
+        self.grade = grade
+
+    def grades_match(self, grades):
+        return any(self.op is None or OPERATORS[self.op](grade, self.grade) for grade in grades)
+
+    def matches(self, db, student_id):
+        entries = db.module_index.get(db.normalise_module(self.module_name), {})
+        return self.grades_match(entries.get(student_id, []))
+
+    def access_path(self, db):
+        entries = db.module_index.get(db.normalise_module(self.module_name), {})
+        return ("module", len(entries),
+                lambda: [student_id for student_id, grades in entries.items() if self.grades_match(grades)])
+
+    def describe(self):
+        if self.op is None:
+            return f"took {self.module_name!r}"
+        return f"took {self.module_name!r} with grade {self.op} {self.grade!r}"
+
+
+class And(Predicate):
+    """Every part must match."""
+
+    def __init__(self, *parts):
+        self.parts = []
+        for part in parts:
+            self.parts.extend(part.parts if isinstance(part, And) else [part])
+
+    def matches(self, db, student_id):
+        return all(part.matches(db, student_id) for part in self.parts)
+
+    def describe(self):
+        return " AND ".join(part.describe() for part in self.parts)
+
+
+class Or(Predicate):
+    """Any part may match; indexed only when every part is."""
+
+    def __init__(self, *parts):
+        self.parts = list(parts)
+
+    def matches(self, db, student_id):
+        return any(part.matches(db, student_id) for part in self.parts)
+
+    def access_path(self, db):
+        paths = [part.access_path(db) for part in self.parts]
+        if any(path is None for path in paths):
+            return None
+        fetch = lambda: list(dict.fromkeys(student_id for _, _, part_fetch in paths for student_id in part_fetch()))
+        return "+".join(path[0] for path in paths), sum(path[1] for path in paths), fetch
+
+    def describe(self):
+        return "(" + " OR ".join(part.describe() for part in self.parts) + ")"
+
+
+class Snapshot:
+    """Read-only view of the data as it was when the snapshot was taken.
+
+    Only records changed since then live here, copied on their first
+    change (None marks a student that didn't exist yet); everything else
+    is read from the live Database, so taking a snapshot is O(1). On disk
+    it is an append-only log: a header line, then one line per copied
+    student, so each save only writes the records copied since the last.
+    """
+
+    def __init__(self, db, name, taken_at, students=None, modules=None):
+        self.db = db
+        self.name = name
+        self.taken_at = taken_at
+        self.students = students or {}  # {student_id: [name, age, course, phone] or None}
+        self.modules = modules or {}  # {student_id: [(module_name, grade), ...] or None}
+        self.saved = False  # whether the log file has been started
+        self.unsaved = []  # student IDs copied since the last save
+
+    def preserve(self, student_id):
+        """Copy a student's live records before the first change to them."""
+        if student_id in self.students:
+            return
+        data = self.db.students.get(student_id)
+        modules = self.db.modules.get(student_id)
+        self.students[student_id] = list(data) if data is not None else None
+        self.modules[student_id] = list(modules) if modules is not None else None
+        self.unsaved.append(student_id)
+
+    def get_students(self):
+        """Retrieve all students as they were."""
+        rows = [(student_id, *data) for student_id, data in self.db.students.items() if student_id not in self.students]
+        rows.extend((student_id, *data) for student_id, data in self.students.items() if data is not None)
+        return rows
+
+    def get_modules(self, student_id):
+        """Retrieve a student's modules as they were."""
+        if student_id in self.modules:
+            return self.modules[student_id] or []
+        return self.db.get_modules(student_id)
+
+    def calculate_gpa(self, student_id):
+        """Calculate a student's GPA from the grades as they were."""
+        return self.db.gpa_engine.calculate(self.get_modules(student_id))
+
+    def log_lines(self):
+        """Lines still to be appended to the log: the header if it is new, then the unsaved copies."""
+        lines = [] if self.saved else [{"name": self.name, "taken_at": self.taken_at}]
+        lines.extend({"student_id": student_id, "student": self.students[student_id],
+                      "modules": self.modules[student_id]} for student_id in self.unsaved)
+        return [json.dumps(line) + "\n" for line in lines]
+
+    @classmethod
+    def from_lines(cls, db, lines):
+        """Rebuild a snapshot from the lines of its log."""
+        header = json.loads(lines[0])
+        snapshot = cls(db, header["name"], header["taken_at"])
+        for line in lines[1:]:
+            record = json.loads(line)
+            modules = record["modules"]
+            snapshot.students[record["student_id"]] = record["student"]
+            snapshot.modules[record["student_id"]] = modules if modules is None else [tuple(module) for module in modules]
+        snapshot.saved = True
+        return snapshot
 
 
 class Database:
     
-    def __init__(self, students_file="students.csv", modules_file="modules.csv"):
-        """Initialize student and module storage with CSV files."""
+    def __init__(self, students_file="students.csv", modules_file="modules.csv", data_dir="data", shard_count=16,
+                 rows_per_shard=1000, grading_file="grading_scales.json", autoload=True):
+        """Initialize student and module storage.
+
+        Data lives in data_dir as CSV shards tied together by manifest.json.
+        students_file and modules_file are only read when there is no manifest
+        yet, and are migrated into shards on the first save. The store uses
+        at least shard_count shards, and more as it grows so that each holds
+        about rows_per_shard students and a save rewrites little. With
+        autoload=False nothing is read until load_data (or begin_load,
+        apply_batch and finish_load) is called.
+        """
         self.students_file = students_file
         self.modules_file = modules_file
+        self.data_dir = data_dir
+        self.manifest_file = os.path.join(data_dir, "manifest.json")
+        self.shard_count = shard_count
+        self.rows_per_shard = rows_per_shard
+        self.shard_members = {}  # {shard: {student_id: None}} in insertion order
+        self.shard_files = {}  # {(kind, shard): file name in data_dir}
+        self.dirty = set()  # {(kind, shard)} changed since the last save
+        self.save_generation = 0
+        self.changes_file = os.path.join(data_dir, "changes.jsonl")
+        self.change_seq = 0  # sequence number of the last recorded change
+        self.pending_changes = []  # feed entries of changes made but not saved yet
         self.students = {}  # {student_id: [name, age, course, phone]}
         self.modules = {}   # {student_id: [(module_name, grade), ...]}
-        self.load_data()
+        self.listeners = []  # callbacks called as listener(event, student_id); a list of IDs for "grades_changed"
+        self.gpa_cache = {}  # {student_id: gpa}
+        self.module_index = {}  # {normalised module name: {student_id: [grade, ...]}}
+        self.courses = StringDictionary()
+        self.module_names = StringDictionary()
+        self.course_codes = {}  # {student_id: course code}
+        self.course_index = {}  # {course fold code: {student_id: None}}
+        self.phone_index = {}  # {phone: student_id}
+        self.generation = 0  # bumped by every change to the data
+        self.query_cache = OrderedDict()  # {query key: (generation, rows, plan)}, least recently used first
+        self.query_cache_size = 64
+        self.query_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self.last_plan = None  # plan behind the rows of the last select()
+        self.rejects_file = os.path.join(data_dir, "rejects.csv")
+        self.snapshots_dir = os.path.join(data_dir, "snapshots")
+        self.snapshots = {}  # {name: Snapshot}
+        self.archive_file = os.path.join(data_dir, "archive.dat")
+        self.archive_index_file = os.path.join(data_dir, "archive.idx")
+        self.archive_index = {}  # {student_id: (offset, length)} in archive_file
+        self.gpa_order = None  # sorted [(gpa, student_id)], built on demand and then kept in step
+        self.gpa_keys = []  # the GPAs of gpa_order, for bisecting
+        self.load_report = {}
+        self.load_size = 0  # bytes to read in the current load
+        self.loading = False  # True from begin_load to finish_load; edits are refused meanwhile
+        try:
+            self.gpa_engine = GpaEngine(grading_file)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            self.gpa_engine = GpaEngine(None)
+        if autoload:
+            self.load_data()
+
+    def add_listener(self, callback):
+        """Register a callback to be told about every data change."""
+        self.listeners.append(callback)
+
+    def notify(self, event, student_id=None):
+        """Tell every listener that the data has changed."""
+        # Every mutation ends here, which invalidates all cached query results
+        self.generation += 1
+        for callback in self.listeners:
+            callback(event, student_id)
 
     def load_data(self):
-        """Load data from CSV files if they exist."""
-        # Load students data
-        if os.path.exists(self.students_file):
+        """Load data from the sharded store, or from the CSV files the first time."""
+        manifest, student_files, module_files = self.begin_load()
+        validator = RowValidator()
+        errors = {}
+        for kind, paths in (("students", student_files), ("modules", module_files)):
             try:
-                with open(self.students_file, 'r', newline='') as f:
-                    reader = csv.reader(f)
-                    next(reader, None)  # Skip header
-                    for row in reader:
-                        if len(row) >= 5:  # Ensure we have all required fields
-                            student_id, name, age, course, phone = row[:5]
-                            self.students[student_id] = [name, int(age), course, phone]
+                for rows, _ in self.read_batches(kind, paths, validator):
+                    self.apply_batch(kind, rows)
             except (csv.Error, IOError, ValueError) as e:
-                messagebox.showerror("Error", f"Failed to load students data: {str(e)}")
-                self.students = {}
-
-        # Load modules data
-        if os.path.exists(self.modules_file):
-            try:
-                with open(self.modules_file, 'r', newline='') as f:
+                errors[kind] = str(e)
+        self.finish_load(manifest, errors, validator)
+
+    def begin_load(self):
+        """Work out which files to load; returns (manifest, student_files, module_files)."""
+        self.loading = True
+        self.courses.bytes_released = 0
+        self.module_names.bytes_released = 0
+        manifest = self.read_manifest()
+        # Needed by edits before the rows are in, so read them up front
+        if manifest is not None and "change_seq" in manifest:
+            self.change_seq = manifest["change_seq"]
+            self.trim_changes()
+        else:
+            self.change_seq = self.read_last_change_seq()
+            self.trim_changes()  # Only cuts off a line torn by a crash
+        self.load_snapshots()
+        self.load_archive_index()
+        if manifest is None:
+            student_files = [self.students_file]
+            module_files = [self.modules_file]
+        else:
+            self.shard_count = manifest["shard_count"]
+            self.save_generation = manifest["generation"]
+            for kind, files in manifest["files"].items():
+                for shard, filename in files.items():
+                    self.shard_files[(kind, int(shard))] = filename
+            student_files = [os.path.join(self.data_dir, filename)
+                             for (kind, _), filename in sorted(self.shard_files.items()) if kind == "students"]
+            module_files = [os.path.join(self.data_dir, filename)
+                            for (kind, _), filename in sorted(self.shard_files.items()) if kind == "modules"]
+        self.load_size = sum(os.path.getsize(path) for path in student_files + module_files if os.path.exists(path))
+        return manifest, student_files, module_files
+
+    @staticmethod
+    def read_batches(kind, paths, validator, batch_size=1000):
+        """Parse students or modules CSV files into batches of validated rows.
+
+        Yields (rows, characters read); rows that fail validation end up in
+        validator.rejects. It touches no Database state, so it is safe to run
+        on a worker thread.
+        """
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', newline='') as f:
+                consumed = [0]
+
+                def counted_lines():
+                    for line in f:
+                        consumed[0] += len(line)
+                        yield line
+
+                reader = csv.reader(counted_lines())
+                next(reader, None)  # Skip header
+                rows = []
+                reported = 0
+                check = validator.check_student if kind == "students" else validator.check_module
+                for row in reader:
+                    if not row:
+                        continue  # Blank line
+                    checked = check(path, reader.line_num, row)
+                    if checked is not None:
+                        rows.append(checked)
+                    if len(rows) >= batch_size:
+                        yield rows, consumed[0] - reported
+                        reported = consumed[0]
+                        rows = []
+                yield rows, consumed[0] - reported
+
+    def apply_batch(self, kind, rows):
+        """Add a batch of rows from read_batches to memory."""
+        self.generation += 1
+        if kind == "students":
+            for student_id, name, age, course, phone in rows:
+                code = self.courses.encode(course)
+                self.students[student_id] = [name, age, self.courses.values[code], phone]
+                self.course_codes[student_id] = code
+        else:
+            for student_id, module_name, grade in rows:
+                if student_id not in self.modules:
+                    self.modules[student_id] = []
+                self.modules[student_id].append((self.module_names.intern(module_name), grade))
+
+    def finish_load(self, manifest, errors, validator):
+        """Report load errors, build the indexes and tell listeners the data is ready.
+
+        Rows read before an unreadable part of a file are kept.
+        """
+        if "students" in errors:
+            messagebox.showerror("Error", f"Failed to load students data: {errors['students']}")
+        if "modules" in errors:
+            messagebox.showerror("Error", f"Failed to load modules data: {errors['modules']}")
+        self.write_rejects(validator.rejects)
+
+        self.course_index = {}
+        for student_id, code in self.course_codes.items():
+            self.course_index.setdefault(self.courses.folds[code], {})[student_id] = None
+        self.phone_index = {data[3]: student_id for student_id, data in self.students.items() if data[3]}
+
+        if manifest is None and (self.students or self.modules):
+            # Migrate the flat CSV files into shards sized for them on the next save
+            self.reshard(self.shard_count_for(len(self.students)))
+        else:
+            self.shard_members = {}
+            for student_id in list(self.students) + list(self.modules):
+                self.shard_members.setdefault(self.shard_of(student_id), {})[student_id] = None
+
+        # Build the module -> students index in one pass
+        self.module_index = {}
+        for student_id in self.modules:
+            self.index_modules(student_id)
+
+        self.load_report = {
+            "students": len(self.students),
+            "grades": sum(len(modules) for modules in self.modules.values()),
+            "courses": len(self.courses.values),
+            "modules": len(self.module_names.values),
+            "bytes_released": self.courses.bytes_released + self.module_names.bytes_released,
+            "bytes_saved": self.courses.bytes_released + self.module_names.bytes_released - self.encoding_overhead(),
+            "rows_checked": validator.rows_checked,
+            "rejected": len(validator.rejects),
+            "validation_ms": round(validator.seconds * 1000, 1),
+        }
+
+        self.loading = False
+        self.gpa_cache.clear()
+        self.gpa_order = None
+        self.notify("reloaded")
+
+    def encoding_overhead(self):
+        """Bytes taken by the dictionaries, the per-student course codes and the course index."""
+        return (self.courses.overhead() + self.module_names.overhead() + sys.getsizeof(self.course_codes)
+                + sys.getsizeof(self.course_index) + sum(sys.getsizeof(members) for members in self.course_index.values()))
+
+    def write_rejects(self, rejects):
+        """Append rejected rows, with their file and line number, to the reject file.
+
+        The row's own fields follow as the remaining columns. Rows already in
+        the file (same source, line, reason and fields) aren't added again,
+        so reloading the same bad file doesn't repeat them.
+        """
+        if not rejects:
+            return
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            new_file = not os.path.exists(self.rejects_file)
+            reported = set()
+            if not new_file:
+                with open(self.rejects_file, 'r', newline='') as f:
                     reader = csv.reader(f)
                     next(reader, None)  # Skip header
-                    for row in reader:
-                        if len(row) >= 3:  # Ensure we have all required fields
-                            student_id, module_name, grade = row[:3]
-                            if student_id not in self.modules:
-                                self.modules[student_id] = []
-                            self.modules[student_id].append((module_name, float(grade)))
-            except (csv.Error, IOError, ValueError) as e:
-                messagebox.showerror("Error", f"Failed to load modules data: {str(e)}")
-                self.modules = {}
+                    reported = {(row[1], row[2], row[3], tuple(row[4:])) for row in reader if len(row) >= 4}
+            detected_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            with open(self.rejects_file, 'a', newline='') as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(['detected_at', 'source', 'line', 'reason', 'fields'])  # Header
+                for source, line, reason, row in rejects:
+                    key = (source, str(line), reason, tuple(row))
+                    if key not in reported:
+                        reported.add(key)
+                        writer.writerow([detected_at, source, line, reason, *row])
+        except (csv.Error, IOError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to write rejected rows: {str(e)}")
+
+    def import_csv(self, students_path=None, modules_path=None):
+        """Validate students and grades from CSV files and add them with one save.
+
+        Rows that clash with existing or archived students (ID or phone) or are malformed
+        go to the reject file. Returns (students added, grades added, rows rejected).
+        """
+        if self.loading:
+            return 0, 0, 0  # Edits wait until the data is loaded
+        validator = RowValidator(self.students, self.phone_index, self.archive_index)
+        new_students = []
+        new_modules = {}
+        try:
+            if students_path:
+                for rows, _ in self.read_batches("students", [students_path], validator):
+                    new_students.extend(rows)
+            if modules_path:
+                for rows, _ in self.read_batches("modules", [modules_path], validator):
+                    for student_id, module_name, grade in rows:
+                        new_modules.setdefault(student_id, []).append((self.module_names.intern(module_name), grade))
+        except (csv.Error, IOError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to import data: {str(e)}")
+            return 0, 0, 0
+
+        changes = []
+        for student_id, name, age, course, phone in new_students:
+            self.insert_student(student_id, name, age, course, phone)
+            self.mark_dirty(student_id, "students")
+            changes.append(("student_added", student_id, {"name": name, "age": age, "course": course, "phone": phone}))
+        for student_id, modules in new_modules.items():
+            self.before_change(student_id)
+            self.unindex_modules(student_id)
+            self.modules.setdefault(student_id, []).extend(modules)
+            self.index_modules(student_id)
+            self.mark_dirty(student_id, "modules")
+            self.invalidate_gpa(student_id)
+            changes.extend(("module_added", student_id, {"module_name": module_name, "grade": grade})
+                           for module_name, grade in modules)
+
+        if changes:
+            self.save_data(changes)
+        self.write_rejects(validator.rejects)
+        self.notify("reloaded")
+        return len(new_students), sum(len(modules) for modules in new_modules.values()), len(validator.rejects)
+
+    def read_manifest(self):
+        """Read the shard manifest, or None if the store hasn't been created yet."""
+        if not os.path.exists(self.manifest_file):
+            return None
+        try:
+            with open(self.manifest_file, 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to read manifest: {str(e)}")
+            return None
+
+    def shard_of(self, student_id):
+        """Shard number a student's rows are stored in."""
+        return zlib.crc32(student_id.encode()) % self.shard_count
+
+    def shard_count_for(self, rows):
+        """Number of shards to keep about rows_per_shard students in each."""
+        return max(self.shard_count, -(-rows // self.rows_per_shard))
+
+    def reshard(self, shard_count):
+        """Spread every student over shard_count shards, all rewritten on the next save."""
+        self.shard_count = shard_count
+        self.shard_members = {}
+        for student_id in list(self.students) + list(self.modules):
+            self.shard_members.setdefault(self.shard_of(student_id), {})[student_id] = None
+        for shard in range(shard_count):
+            self.dirty.update({("students", shard), ("modules", shard)})
+
+    def mark_dirty(self, student_id, *kinds):
+        """Flag the shards holding a student's data as needing a save."""
+        shard = self.shard_of(student_id)
+        self.shard_members.setdefault(shard, {})[student_id] = None
+        for kind in kinds:
+            self.dirty.add((kind, shard))
+
+    @staticmethod
+    def normalise_module(module_name):
+        """Key used to match module names regardless of case and spacing."""
+        return module_name.strip().upper()
+
+    def index_modules(self, student_id):
+        """Add a student's modules to the module index."""
+        for module_name, grade in self.modules.get(student_id, []):
+            entries = self.module_index.setdefault(self.normalise_module(module_name), {})
+            entries.setdefault(student_id, []).append(grade)
+
+    def unindex_modules(self, student_id):
+        """Remove a student's modules from the module index."""
+        for module_name, _ in self.modules.get(student_id, []):
+            key = self.normalise_module(module_name)
+            entries = self.module_index.get(key)
+            if entries is not None:
+                entries.pop(student_id, None)
+                if not entries:
+                    del self.module_index[key]
+
+    def save_data(self, changes=()):
+        """Save the changed shards and change feed entries, then commit them with the manifest.
+
+        Each dirty shard is written to a new file and only becomes visible
+        once the manifest pointing at it has been atomically replaced, so a
+        crash mid-save leaves the previous state intact. changes
+        ([(op, student_id, {field: value}), ...]) are appended to the feed
+        before the commit, and the manifest records the last committed
+        sequence number; feed entries past it are dropped on the next load.
+        Snapshots are saved first: they only hold the old values, so they
+        stay correct whether or not the manifest commit that follows
+        succeeds. Returns whether everything was saved; if not, the changes
+        stay in memory, dirty and in pending_changes, and go out with the
+        next save.
+        """
+        self.pending_changes.extend(changes)
+        if not self.save_snapshots():
+            return False
+        if not self.dirty and not self.pending_changes:
+            return True
+        if len(self.students) > 2 * self.rows_per_shard * self.shard_count:
+            # Shards only ever grow in number, so every old shard file is replaced
+            self.reshard(self.shard_count_for(len(self.students)))
+
+        generation = self.save_generation + 1
+        written = {}
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            for kind, shard in sorted(self.dirty):
+                filename = f"{kind}_{shard:03d}_{generation}.csv"
+                self.write_shard(kind, shard, os.path.join(self.data_dir, filename))
+                written[(kind, shard)] = filename
+        except IOError as e:
+            messagebox.showerror("Error", f"Failed to save data: {str(e)}")
+            self.remove_files(written.values())
+            return False
 
-    def save_data(self):
-        """Save data to CSV files."""
-        # Save students data
+        feed_size = os.path.getsize(self.changes_file) if os.path.exists(self.changes_file) else 0
         try:
-            with open(self.students_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(['student_id', 'name', 'age', 'course', 'phone'])  # Header
-                for student_id, data in self.students.items():
-                    writer.writerow([student_id] + data)
+            change_seq = self.write_changes(self.pending_changes)
         except IOError as e:
-            messagebox.showerror("Error", f"Failed to save students data: {str(e)}")
+            messagebox.showerror("Error", f"Failed to record changes: {str(e)}")
+            self.remove_files(written.values())
+            self.trim_changes(feed_size)
+            return False
+
+        replaced = [self.shard_files[key] for key in written if key in self.shard_files]
+        files = dict(self.shard_files)
+        files.update(written)
+        manifest = {"version": 1, "shard_count": self.shard_count, "generation": generation,
+                    "change_seq": change_seq, "files": {}}
+        for (kind, shard), filename in sorted(files.items()):
+            manifest["files"].setdefault(kind, {})[str(shard)] = filename
 
-        # Save modules data
         try:
-            with open(self.modules_file, 'w', newline='') as f:
-                writer = csv.writer(f)
+            tmp_file = self.manifest_file + ".tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(manifest, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.manifest_file)
+        except IOError as e:
+            messagebox.showerror("Error", f"Failed to save manifest: {str(e)}")
+            self.remove_files(written.values())
+            self.trim_changes(feed_size)
+            return False
+
+        self.shard_files = files
+        self.save_generation = generation
+        self.change_seq = change_seq
+        self.pending_changes = []
+        self.dirty.clear()
+        self.remove_files(replaced)
+        return True
+
+    def write_shard(self, kind, shard, path):
+        """Write every row of one shard to a CSV file."""
+        members = self.shard_members.get(shard, {})
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            if kind == "students":
+                writer.writerow(['student_id', 'name', 'age', 'course', 'phone'])  # Header
+                for student_id in members:
+                    if student_id in self.students:
+                        writer.writerow([student_id] + self.students[student_id])
+            else:
                 writer.writerow(['student_id', 'module_name', 'grade'])  # Header
-                for student_id, modules in self.modules.items():
-                    for module in modules:
+                for student_id in members:
+                    for module in self.modules.get(student_id, []):
                         writer.writerow([student_id, module[0], module[1]])
-        except IOError as e:
-            messagebox.showerror("Error", f"Failed to save modules data: {str(e)}")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove_files(self, filenames):
+        """Delete shard files that are no longer referenced."""
+        for filename in filenames:
+            try:
+                os.remove(os.path.join(self.data_dir, filename))
+            except OSError:
+                pass
 
     def add_student(self, student_id, name, age, course, phone):
         """Add a new student."""
-        if student_id in self.students:
-            return False  # Student already exists
-        self.students[student_id] = [name, age, course, phone]
-        self.modules[student_id] = []
-        self.save_data()
+        if self.loading:
+            return False  # Edits wait until the data is loaded
+        if student_id in self.students or student_id in self.archive_index or phone in self.phone_index:
+            return False  # Student or phone number already exists, or the ID is archived
+        self.insert_student(student_id, name, age, course, phone)
+        self.mark_dirty(student_id, "students")
+        saved = self.save_data([("student_added", student_id,
+                                 {"name": name, "age": age, "course": course, "phone": phone})])
+        self.notify("student_added", student_id)
+        return saved
+
+    def insert_student(self, student_id, name, age, course, phone):
+        """Put a new student in memory and in the course, phone and GPA indexes."""
+        self.before_change(student_id)
+        code = self.courses.encode(course)
+        self.students[student_id] = [name, age, self.courses.values[code], phone]
+        self.course_codes[student_id] = code
+        self.course_index.setdefault(self.courses.folds[code], {})[student_id] = None
+        if phone:
+            self.phone_index[phone] = student_id
+        self.modules.setdefault(student_id, [])
+        self.invalidate_gpa(student_id)
+
+    def before_change(self, student_id):
+        """Let every snapshot copy a student's records before they change."""
+        for snapshot in self.snapshots.values():
+            snapshot.preserve(student_id)
+
+    def create_snapshot(self, name):
+        """Take a named, read-only point-in-time snapshot of the data.
+
+        Nothing is copied now; records are copied into the snapshot the first
+        time they change afterwards.
+        """
+        if self.loading or not name or name in self.snapshots or not all(c.isalnum() or c in "-_" for c in name):
+            return False  # Invalid or duplicate name
+        snapshot = Snapshot(self, name, datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
+        self.snapshots[name] = snapshot
+        self.save_snapshots()
+        return True
+
+    def get_snapshot(self, name):
+        """Retrieve a snapshot by name, or None."""
+        return self.snapshots.get(name)
+
+    def list_snapshots(self):
+        """Retrieve (name, taken_at) for every snapshot, oldest first."""
+        return sorted(((s.name, s.taken_at) for s in self.snapshots.values()), key=lambda item: item[1])
+
+    def delete_snapshot(self, name):
+        """Delete a snapshot."""
+        if self.loading or name not in self.snapshots:
+            return False
+        del self.snapshots[name]
+        try:
+            os.remove(os.path.join(self.snapshots_dir, f"{name}.jsonl"))
+        except OSError:
+            pass
         return True
 
+    def save_snapshots(self):
+        """Append the records copied since the last save to each snapshot's log."""
+        try:
+            for snapshot in self.snapshots.values():
+                if not snapshot.saved or snapshot.unsaved:
+                    os.makedirs(self.snapshots_dir, exist_ok=True)
+                    path = os.path.join(self.snapshots_dir, f"{snapshot.name}.jsonl")
+                    with open(path, 'a' if snapshot.saved else 'w') as f:
+                        f.writelines(snapshot.log_lines())
+                        f.flush()
+                        os.fsync(f.fileno())
+                    snapshot.saved = True
+                    snapshot.unsaved = []
+        except IOError as e:
+            messagebox.showerror("Error", f"Failed to save snapshots: {str(e)}")
+            return False
+        return True
+
+    def load_snapshots(self):
+        """Read every saved snapshot."""
+        self.snapshots = {}
+        if not os.path.isdir(self.snapshots_dir):
+            return
+        for filename in sorted(os.listdir(self.snapshots_dir)):
+            if not filename.endswith(".jsonl"):
+                continue
+            try:
+                path = os.path.join(self.snapshots_dir, filename)
+                with open(path, 'r+') as f:
+                    lines = f.readlines()
+                    if lines and not lines[-1].endswith("\n"):
+                        # Cut off a record torn by a crash; its change was never committed
+                        f.truncate(sum(len(line.encode()) for line in lines[:-1]))
+                        lines.pop()
+                snapshot = Snapshot.from_lines(self, lines)
+                self.snapshots[snapshot.name] = snapshot
+            except (IOError, ValueError, KeyError) as e:
+                messagebox.showerror("Error", f"Failed to load snapshot {filename}: {str(e)}")
+
     def get_students(self):
         """Retrieve all students."""
         return [(id, *data) for id, data in self.students.items()]
 
     def add_module(self, student_id, module_name, grade):
         """Add a module and grade for a student."""
-        if student_id in self.modules:
-            self.modules[student_id].append((module_name, grade))
-            self.save_data()
+        if not self.loading and student_id in self.modules:
+            self.before_change(student_id)
+            self.unindex_modules(student_id)
+            self.modules[student_id].append((self.module_names.intern(module_name), grade))
+            self.index_modules(student_id)
+            self.mark_dirty(student_id, "modules")
+            saved = self.save_data([("module_added", student_id, {"module_name": module_name, "grade": grade})])
+            self.invalidate_gpa(student_id)
+            self.notify("modules_changed", student_id)
+            return saved
+        return False
+
+    def get_courses(self):
+        """Retrieve the sorted list of distinct courses."""
+        return sorted(self.courses.values[code] for code in set(self.course_codes.values()))
+
+    def get_module_names(self):
+        """Retrieve the sorted list of distinct (normalised) module names."""
+        return sorted(self.module_index)
+
+    def get_module_students(self, module_name):
+        """Retrieve (student_id, grade) for everyone who took a module."""
+        entries = self.module_index.get(self.normalise_module(module_name), {})
+        return [(student_id, grade) for student_id, grades in entries.items() for grade in grades]
+
+    def get_module_failures(self, module_name, pass_mark=None):
+        """Retrieve (student_id, grade) for everyone who failed a module.
+
+        By default a fail is a mark that earns no points on the current grading scale.
+        """
+        if pass_mark is None:
+            pass_mark = self.gpa_engine.scale.pass_mark()
+        return [(student_id, grade) for student_id, grade in self.get_module_students(module_name)
+                if grade < pass_mark]
+
+    def get_module_average(self, module_name):
+        """Calculate the average grade of a module."""
+        grades = [grade for _, grade in self.get_module_students(module_name)]
+        if not grades:
+            return 0.0
+        return round(sum(grades) / len(grades), 2)
 
     def get_modules(self, student_id):
         """Retrieve all modules for a student."""
@@ -94,48 +944,522 @@ class Database:
 
     def delete_module(self, student_id, module_name):
         """Remove a module from the student."""
-        if student_id in self.modules:
+        if not self.loading and student_id in self.modules:
+            self.before_change(student_id)
+            self.unindex_modules(student_id)
             self.modules[student_id] = [mod for mod in self.modules[student_id] if mod[0] != module_name]
-            self.save_data()
+            self.index_modules(student_id)
+            self.mark_dirty(student_id, "modules")
+            saved = self.save_data([("module_deleted", student_id, {"module_name": module_name})])
+            self.invalidate_gpa(student_id)
+            self.notify("modules_changed", student_id)
+            return saved
+        return False
 
     def delete_student(self, student_id):
         """Delete a student from the database."""
+        if self.loading:
+            return False  # Edits wait until the data is loaded
+        if student_id not in self.students and student_id not in self.modules:
+            return False  # Nothing to delete, so no shards to rewrite
+        self.remove_student(student_id)
+        saved = self.save_data([("student_deleted", student_id, {})])
+        self.invalidate_gpa(student_id)
+        self.notify("student_deleted", student_id)
+        return saved
+
+    def remove_student(self, student_id):
+        """Take a student and their modules out of memory and the indexes."""
+        self.before_change(student_id)
         if student_id in self.students:
-            del self.students[student_id]
+            phone = self.students.pop(student_id)[3]
+            if self.phone_index.get(phone) == student_id:
+                del self.phone_index[phone]
+            fold = self.courses.folds[self.course_codes.pop(student_id)]
+            del self.course_index[fold][student_id]
         if student_id in self.modules:
+            self.unindex_modules(student_id)
             del self.modules[student_id]
-        self.save_data()
+        self.mark_dirty(student_id, "students", "modules")
+        self.shard_members[self.shard_of(student_id)].pop(student_id, None)
+
+    def archive_student(self, student_id, status="graduated"):
+        """Move an inactive student out of the working set into the archive."""
+        if self.loading or student_id not in self.students:
+            return False
+        record = {
+            "student_id": student_id,
+            "student": self.students[student_id],
+            "modules": self.modules.get(student_id, []),
+            "status": status,
+            "archived_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        # Written to the archive first, so a crash can't lose the student
+        if not self.append_archive(student_id, record):
+            return False
+        self.remove_student(student_id)
+        if not self.save_data([("student_archived", student_id, {"status": status})]):
+            # Undo it, or the shards and the archive would both hold the student
+            self.pending_changes.pop()
+            self.append_archive_index(student_id, -1, 0)  # Tombstone
+            self.reinstate_student(student_id, record["student"], record["modules"])
+            return False
+        self.invalidate_gpa(student_id)
+        self.notify("student_deleted", student_id)
         return True
 
+    def restore_student(self, student_id):
+        """Bring an archived student and their grades back into the working set."""
+        if self.loading:
+            return False  # Edits wait until the data is loaded
+        record = self.get_archived(student_id)
+        if record is None or student_id in self.students:
+            return False
+        name, age, course, phone = record["student"]
+        if phone in self.phone_index:
+            return False  # Phone number now belongs to someone else
+        self.reinstate_student(student_id, record["student"], record["modules"])
+        # The archive copy is only dropped once the student is safely back in the shards
+        if not self.save_data([("student_restored", student_id,
+                                {"name": name, "age": age, "course": course, "phone": phone})]):
+            self.pending_changes.pop()
+            self.remove_student(student_id)
+            self.invalidate_gpa(student_id)
+            return False
+        self.append_archive_index(student_id, -1, 0)  # Tombstone
+        self.notify("student_added", student_id)
+        return True
+
+    def reinstate_student(self, student_id, student, modules):
+        """Put a student and their modules back into memory and the indexes."""
+        name, age, course, phone = student
+        self.insert_student(student_id, name, age, course, phone)
+        self.modules[student_id] = [(self.module_names.intern(module_name), grade) for module_name, grade in modules]
+        self.index_modules(student_id)
+        self.mark_dirty(student_id, "students", "modules")
+        self.invalidate_gpa(student_id)
+
+    def append_archive(self, student_id, record):
+        """Append a compressed record to the archive and index it by student_id."""
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            with open(self.archive_file, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                data = zlib.compress(json.dumps(record).encode())
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except IOError as e:
+            messagebox.showerror("Error", f"Failed to archive student: {str(e)}")
+            return False
+        return self.append_archive_index(student_id, offset, len(data))
+
+    def append_archive_index(self, student_id, offset, length):
+        """Record where a student's archive record is; length 0 marks a restore."""
+        try:
+            with open(self.archive_index_file, 'a', newline='') as f:
+                csv.writer(f).writerow([student_id, offset, length])
+                f.flush()
+                os.fsync(f.fileno())
+        except IOError as e:
+            messagebox.showerror("Error", f"Failed to update archive index: {str(e)}")
+            return False
+        if length:
+            self.archive_index[student_id] = (offset, length)
+        else:
+            self.archive_index.pop(student_id, None)
+        return True
+
+    def load_archive_index(self):
+        """Read the archive's student_id index; the records stay on disk."""
+        self.archive_index = {}
+        if not os.path.exists(self.archive_index_file):
+            return
+        try:
+            with open(self.archive_index_file, 'r', newline='') as f:
+                for student_id, offset, length in csv.reader(f):
+                    if int(length):
+                        self.archive_index[student_id] = (int(offset), int(length))
+                    else:
+                        self.archive_index.pop(student_id, None)
+        except (csv.Error, IOError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to load archive index: {str(e)}")
+
+    def get_archived(self, student_id):
+        """Retrieve an archived student's record, or None."""
+        if student_id not in self.archive_index:
+            return None
+        offset, length = self.archive_index[student_id]
+        try:
+            with open(self.archive_file, 'rb') as f:
+                f.seek(offset)
+                return json.loads(zlib.decompress(f.read(length)))
+        except (IOError, zlib.error, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to read archive: {str(e)}")
+            return None
+
+    def search_archive(self, text):
+        """Retrieve archived records whose student_id contains text."""
+        text = text.lower()
+        return [record for record in (self.get_archived(student_id) for student_id in self.archive_index
+                                      if text in student_id.lower())
+                if record is not None]
+
+    def find_student(self, student_id):
+        """Look a student up in the working set, then in the archive.
+
+        Returns (student_id, name, age, course, phone, status) or None.
+        """
+        if student_id in self.students:
+            return (student_id, *self.students[student_id], "active")
+        record = self.get_archived(student_id)
+        if record is None:
+            return None
+        return (student_id, *record["student"], record["status"])
+
     def update_module_grade(self, student_id, module_name, new_grade):
         """Update a module's grade for a student."""
-        if student_id in self.modules:
+        if not self.loading and student_id in self.modules:
             for i, (mod_name, _) in enumerate(self.modules[student_id]):
                 if mod_name == module_name:
+                    self.before_change(student_id)
+                    self.unindex_modules(student_id)
                     self.modules[student_id][i] = (module_name, new_grade)
-                    self.save_data()
-                    return True
+                    self.index_modules(student_id)
+                    self.mark_dirty(student_id, "modules")
+                    saved = self.save_data([("grade_updated", student_id,
+                                             {"module_name": module_name, "grade": new_grade})])
+                    self.invalidate_gpa(student_id)
+                    self.notify("modules_changed", student_id)
+                    return saved
         return False
 
-    def calculate_gpa(self, student_id):
-        """Calculate actual GPA on 4.0 scale."""
-        grades = [grade for _, grade in self.modules.get(student_id, [])]
-        if not grades:
-            return 0.0
-
-        total_points = 0
-        for grade in grades:
-            if grade >= 90:
-                total_points += 4.0
-            elif grade >= 80:
-                total_points += 3.0
-            elif grade >= 70:
-                total_points += 2.0
-            elif grade >= 60:
-                total_points += 1.0
-            # Below 60 = 0.0
+    def set_module_grades(self, module_name, grades):
+        """Set one module's grade for many students with a single save.
+
+        grades is {student_id: grade}. Students who don't have the module yet
+        get it added. Returns the number of students updated, or 0 if the
+        save failed.
+        """
+        if self.loading:
+            return 0  # Edits wait until the data is loaded
+        key = self.normalise_module(module_name)
+        changed = []
+        added = set()
+        for student_id, grade in grades.items():
+            if student_id not in self.modules:
+                continue
+            self.before_change(student_id)
+            self.unindex_modules(student_id)
+            modules = self.modules[student_id]
+            for i, (mod_name, _) in enumerate(modules):
+                if self.normalise_module(mod_name) == key:
+                    modules[i] = (mod_name, grade)
+                    break
+            else:
+                modules.append((self.module_names.intern(module_name), grade))
+                added.add(student_id)
+            self.index_modules(student_id)
+            self.mark_dirty(student_id, "modules")
+            changed.append(student_id)
+
+        saved = True
+        if changed:
+            saved = self.save_data([("module_added" if student_id in added else "grade_updated", student_id,
+                                     {"module_name": module_name, "grade": grades[student_id]})
+                                    for student_id in changed])
+            # Work out the new GPAs in one pass for the whole batch
+            gpas = self.gpa_engine.calculate_many({student_id: self.modules[student_id] for student_id in changed})
+            for student_id in changed:
+                self.invalidate_gpa(student_id, gpas[student_id])
+            self.notify("grades_changed", changed)
+        return len(changed) if saved else 0
+
+    def write_changes(self, changes):
+        """Append mutations to the change feed, numbering them in order, and flush it to disk.
+
+        changes is [(op, student_id, {field: value}), ...]. Returns the
+        sequence number of the last one; save_data commits it.
+        """
+        if not changes:
+            return self.change_seq
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        seq = self.change_seq
+        lines = []
+        for op, student_id, fields in changes:
+            seq += 1
+            record = {"seq": seq, "time": timestamp, "op": op, "student_id": student_id}
+            record.update(fields)
+            lines.append(json.dumps(record) + "\n")
+        with open(self.changes_file, 'a') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        return seq
+
+    def trim_changes(self, size=None):
+        """Cut off feed entries that were never committed.
+
+        size is the feed length to go back to; by default everything after
+        change_seq is dropped.
+        """
+        if not os.path.exists(self.changes_file):
+            return
+        try:
+            with open(self.changes_file, 'r+b') as f:
+                if size is None:
+                    size = self.find_change_offset(f, "seq", self.change_seq + 1)
+                f.truncate(size)
+        except (IOError, ValueError, KeyError) as e:
+            messagebox.showerror("Error", f"Failed to trim change feed: {str(e)}")
+
+    def read_last_change_seq(self):
+        """Sequence number of the last complete change in the feed, or 0."""
+        if not os.path.exists(self.changes_file):
+            return 0
+        try:
+            with open(self.changes_file, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                position = f.tell()
+                # Walk back from the end to the start of the last line
+                while position > 0:
+                    step = min(4096, position)
+                    position -= step
+                    f.seek(position)
+                    data = f.read()
+                    lines = data.splitlines()
+                    if lines and not data.endswith(b"\n"):
+                        lines.pop()  # Torn by a crash mid-append
+                    if len(lines) > 1 or position == 0:
+                        return json.loads(lines[-1])["seq"] if lines else 0
+        except (IOError, ValueError, KeyError) as e:
+            messagebox.showerror("Error", f"Failed to read change feed: {str(e)}")
+        return 0
+
+    def find_change_offset(self, f, field, value):
+        """Byte offset of the first change whose field is >= value.
+
+        The feed is ordered by both seq and time, so this is a binary search
+        over the file and never reads it in full. A last line torn by a crash
+        counts as greater than any value.
+        """
+        f.seek(0, os.SEEK_END)
+        low, high = 0, f.tell()
+        result = high
+        while low < high:
+            middle = (low + high) // 2
+            if middle == 0:
+                f.seek(0)
+            else:
+                f.seek(middle - 1)
+                f.readline()  # Move to the first line starting at or after middle
+            start = f.tell()
+            line = f.readline()
+            if not line:
+                high = middle
+            elif not line.endswith(b"\n") or json.loads(line)[field] >= value:
+                result = start
+                high = middle
+            else:
+                low = start + len(line)
+        return result
+
+    @staticmethod
+    def normalise_change_time(value):
+        """Convert an ISO 8601 time to the feed's UTC timestamp format.
+
+        Times without a zone are taken as UTC. Feed timestamps only compare
+        correctly as strings in exactly this format.
+        """
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    def get_changes(self, since_seq=0, since_time=None):
+        """Retrieve the committed changes after sequence since_seq and at or after since_time.
+
+        Works without loading the data: entries past the manifest's
+        change_seq, left by a save that never committed, are not returned.
+        """
+        if not os.path.exists(self.changes_file):
+            return []
+        manifest = self.read_manifest()
+        committed_seq = manifest.get("change_seq") if manifest is not None else None
+        with open(self.changes_file, 'rb') as f:
+            offset = self.find_change_offset(f, "seq", since_seq + 1)
+            if since_time is not None:
+                offset = max(offset, self.find_change_offset(f, "time", self.normalise_change_time(since_time)))
+            end = self.find_change_offset(f, "seq", committed_seq + 1) if committed_seq is not None else None
+            f.seek(offset)
+            changes = []
+            for line in f:
+                offset += len(line)
+                if not line.endswith(b"\n") or (end is not None and offset > end):
+                    break  # Torn or uncommitted
+                if line.strip():
+                    changes.append(json.loads(line))
+            return changes
+
+    def export_changes(self, path, since_seq=0, since_time=None):
+        """Write the changes since a sequence number or timestamp to a CSV file.
+
+        Returns the sequence number to pass as since_seq on the next export.
+        """
+        changes = self.get_changes(since_seq, since_time)
+        columns = ['seq', 'time', 'op', 'student_id', 'name', 'age', 'course', 'phone', 'module_name', 'grade', 'status']
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(changes)
+        return changes[-1]["seq"] if changes else max(since_seq, 0)
 
-        return round(total_points / len(grades), 2)
+    def calculate_gpa(self, student_id):
+        """Calculate GPA on the selected grading scale."""
+        if student_id in self.gpa_cache:
+            return self.gpa_cache[student_id]
+
+        gpa = self.gpa_engine.calculate(self.modules.get(student_id, []))
+        self.gpa_cache[student_id] = gpa
+        return gpa
+
+    def set_grading_scale(self, name):
+        """Switch grading scale and recompute every GPA in one pass."""
+        self.gpa_engine.use_scale(name)
+        self.gpa_cache = self.gpa_engine.calculate_many(self.modules)
+        self.gpa_order = None
+        self.notify("reloaded")
+
+    def invalidate_gpa(self, student_id, gpa=None):
+        """Refresh a student's GPA after their grades change; gpa is the new value if already known.
+
+        Once the GPA ordering exists it is kept in step, moving just this
+        student instead of re-sorting the roster.
+        """
+        old = self.gpa_cache.pop(student_id, None)
+        if gpa is not None:
+            self.gpa_cache[student_id] = gpa
+        if self.gpa_order is None:
+            return
+        if old is not None:
+            i = bisect.bisect_left(self.gpa_order, (old, student_id))
+            if i < len(self.gpa_order) and self.gpa_order[i] == (old, student_id):
+                del self.gpa_order[i]
+                del self.gpa_keys[i]
+        if student_id in self.students:
+            gpa = self.calculate_gpa(student_id)
+            i = bisect.bisect_left(self.gpa_order, (gpa, student_id))
+            self.gpa_order.insert(i, (gpa, student_id))
+            self.gpa_keys.insert(i, gpa)
+
+    def gpa_bounds(self, op, gpa):
+        """Slice of the GPA ordering whose GPAs compare to gpa with op."""
+        keys = self.gpa_keys
+        if op == "<":
+            return 0, bisect.bisect_left(keys, gpa)
+        if op == "<=":
+            return 0, bisect.bisect_right(keys, gpa)
+        if op == ">":
+            return bisect.bisect_right(keys, gpa), len(keys)
+        if op == ">=":
+            return bisect.bisect_left(keys, gpa), len(keys)
+        return bisect.bisect_left(keys, gpa), bisect.bisect_right(keys, gpa)
+
+    def estimate_gpa_range(self, op, gpa):
+        """Rows get_gpa_range would return: exact once the GPA ordering exists, else a rough guess."""
+        if self.gpa_order is None:
+            return len(self.students) // (10 if op == "==" else 2)
+        start, end = self.gpa_bounds(op, gpa)
+        return end - start
+
+    def get_gpa_range(self, op, gpa):
+        """Student IDs whose GPA compares to gpa with op, using the GPA ordering."""
+        if self.gpa_order is None:
+            missing = {student_id: self.modules.get(student_id, [])
+                       for student_id in self.students if student_id not in self.gpa_cache}
+            self.gpa_cache.update(self.gpa_engine.calculate_many(missing))
+            self.gpa_order = sorted((self.gpa_cache[student_id], student_id) for student_id in self.students)
+            self.gpa_keys = [value for value, _ in self.gpa_order]
+
+        start, end = self.gpa_bounds(op, gpa)
+        return [student_id for _, student_id in self.gpa_order[start:end]]
+
+    def plan_query(self, predicate):
+        """Choose the most selective index for a predicate.
+
+        Returns (plan, fetch, residual): fetch() gives the candidate student
+        IDs, residual the predicates still to check on each candidate, and
+        plan describes the choice for explain().
+        """
+        conjuncts = predicate.parts if isinstance(predicate, And) else [predicate]
+        best = None
+        for part in conjuncts:
+            access = part.access_path(self)
+            if access is not None and (best is None or access[1] < best[1][1]):
+                best = (part, access)
+
+        if best is None:
+            driver = None
+            plan = {"index": "full scan", "driver": None, "estimated_rows": len(self.students)}
+            fetch = lambda: list(self.students)
+        else:
+            driver, (index, estimate, fetch) = best
+            plan = {"index": index, "driver": driver.describe(), "estimated_rows": estimate}
+        residual = [part for part in conjuncts if part is not driver]
+        plan["filters"] = [part.describe() for part in residual]
+        return plan, fetch, residual
+
+    def query(self, predicate):
+        """Retrieve the students matching a predicate, like get_students."""
+        return self.run_query(predicate)[1]
+
+    def run_query(self, predicate):
+        """Plan and run a predicate; returns (plan, rows like get_students)."""
+        plan, fetch, residual = self.plan_query(predicate)
+        rows = []
+        for student_id in fetch():
+            if student_id in self.students and all(part.matches(self, student_id) for part in residual):
+                rows.append((student_id, *self.students[student_id]))
+        return plan, rows
+
+    SORT_COLUMNS = {"id": 0, "name": 1, "age": 2, "course": 3, "phone": 4, "gpa": 5}
+
+    def select(self, predicate=None, sort=None, descending=False, page=None, page_size=50):
+        """Rows (id, name, age, course, phone, gpa) matching a predicate, sorted and paged.
+
+        Results are memoized by their parameters and reused until the data
+        generation changes; the cache keeps the most recently used entries.
+        The plan they came from is left in last_plan.
+        """
+        key = (predicate.describe() if predicate is not None else None, sort, descending,
+               page, page_size if page is not None else None)
+        cached = self.query_cache.get(key)
+        if cached is not None and cached[0] == self.generation:
+            self.query_cache.move_to_end(key)
+            self.query_cache_stats["hits"] += 1
+            self.last_plan = cached[2]
+            return cached[1]
+
+        self.query_cache_stats["misses"] += 1
+        plan, students = (None, self.get_students()) if predicate is None else self.run_query(predicate)
+        rows = [(*student, self.calculate_gpa(student[0])) for student in students]
+        if sort is not None:
+            column = self.SORT_COLUMNS[sort]
+            rows.sort(key=lambda row: row[column], reverse=descending)
+        if page is not None:
+            rows = rows[page * page_size:(page + 1) * page_size]
+
+        self.query_cache[key] = (self.generation, rows, plan)
+        self.query_cache.move_to_end(key)
+        self.last_plan = plan
+        while len(self.query_cache) > self.query_cache_size:
+            self.query_cache.popitem(last=False)
+            self.query_cache_stats["evictions"] += 1
+        return rows
+
+    def explain(self, predicate):
+        """Describe the plan query() would use for a predicate."""
+        return self.plan_query(predicate)[0]
 
 
 class StudentManagementApp:
@@ -149,31 +1473,206 @@ class StudentManagementApp:
         # Add window close handler
         self.master.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        self.db = Database()
+        # Every screen is built once into its own frame and raised when shown
+        self.container = tk.Frame(self.master, bg='#4CAF50')
+        self.container.pack(expand=True, fill=tk.BOTH)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+        self.frames = {}
+        self.current_student_id = None
+
+        # The dashboard comes up straight away; data arrives in the background
+        self.db = Database(autoload=False)
+        self.db.add_listener(self.on_data_changed)
         self.create_dashboard()
+        self.start_loading()
+
+    def start_loading(self):
+        """Parse the data files on a worker thread while the GUI stays usable."""
+        manifest, student_files, module_files = self.db.begin_load()
+        self.load_queue = queue.Queue()
+        self.load_manifest = manifest
+        self.load_errors = {}
+        self.load_validator = RowValidator()
+        self.loaded_size = 0
+
+        def worker():
+            try:
+                for kind, paths in (("students", student_files), ("modules", module_files)):
+                    try:
+                        for rows, size in Database.read_batches(kind, paths, self.load_validator):
+                            self.load_queue.put((kind, rows, size))
+                    except (csv.Error, IOError, ValueError) as e:
+                        self.load_queue.put(("error", kind, str(e)))
+            finally:
+                # Always finish, or the Database would stay locked for edits
+                self.load_queue.put(("done", None, None))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.master.after(20, self.poll_loader)
+
+    def poll_loader(self):
+        """Apply the batches parsed so far; Tk and the Database are only touched here."""
+        try:
+            # A few batches per tick keeps the window responsive
+            for _ in range(5):
+                kind, rows, size = self.load_queue.get_nowait()
+                if kind == "done":
+                    self.db.finish_load(self.load_manifest, self.load_errors, self.load_validator)
+                    self.load_progress.pack_forget()
+                    return
+                if kind == "error":
+                    # Failures arrive as ("error", kind, message)
+                    self.load_errors[rows] = size
+                    continue
+
+                self.db.apply_batch(kind, rows)
+                self.loaded_size += size
+                if kind == "students" and "view_students" in self.frames:
+                    for row in rows:
+                        self.refresh_student_row(row[0])
+        except queue.Empty:
+            pass
+
+        if self.db.load_size:
+            self.load_progress.configure(value=100 * self.loaded_size / self.db.load_size)
+        self.load_status.configure(text=f"Loading data... {len(self.db.students)} students so far")
+        self.master.after(20, self.poll_loader)
 
     def on_close(self):
         """Handle window close event."""
-        # Data is already saved automatically after each operation
+        # Data is saved after each operation; retry any save that failed
+        if (self.db.dirty or self.db.pending_changes) and not self.db.save_data():
+            if not messagebox.askyesno("Unsaved Changes", "Some changes could not be saved. Exit anyway?"):
+                return
         self.master.destroy()
 
+    def report_failure(self, message):
+        """Explain an edit that returned False: kept but unsaved, or refused with message."""
+        if self.db.pending_changes:
+            messagebox.showwarning("Not Saved", "The change was made but could not be saved yet; "
+                                                "it will be saved with the next change.")
+        else:
+            messagebox.showerror("Error", message)
+
+    def still_loading(self):
+        """Tell the user edits have to wait while the data is still loading."""
+        if self.db.loading:
+            messagebox.showerror("Error", "Still loading data, please try again in a moment.")
+            return True
+        return False
+
+    def show_frame(self, name, builder):
+        """Raise the named screen, building it the first time it is shown."""
+        if name not in self.frames:
+            frame = tk.Frame(self.container, bg='#4CAF50')
+            frame.grid(row=0, column=0, sticky='nsew')
+            builder(frame)
+            self.frames[name] = frame
+        self.frames[name].tkraise()
+        return self.frames[name]
+
+    def on_data_changed(self, event, student_id):
+        """Update the screens that are already built after a data change."""
+        student_ids = student_id if event == "grades_changed" else [student_id]
+        if "dashboard" in self.frames and event == "reloaded":
+            self.update_load_status()
+
+        if "view_students" in self.frames:
+            if event == "reloaded":
+                self.update_course_choices()
+                self.apply_filters()
+            elif event == "student_deleted":
+                if self.tree.exists(student_id):
+                    self.tree.delete(student_id)
+                self.update_course_choices()
+            else:
+                if event == "student_added":
+                    self.update_course_choices()
+                for changed_id in student_ids:
+                    self.refresh_student_row(changed_id)
+
+        if "bulk_grades" in self.frames and event in ("reloaded", "student_added", "student_deleted", "grades_changed"):
+            self.update_bulk_choices()
+
+        if "module_view" in self.frames:
+            self.module_view_dropdown.configure(values=self.db.get_module_names())
+            self.apply_module_view()
+
+        if "manage_modules" in self.frames and (event == "reloaded" or self.current_student_id in student_ids):
+            self.refresh_module_tree()
+
     def create_dashboard(self):
         """Main dashboard."""
-        self.clear_window()
-        tk.Label(self.master, text="STUDENT MANAGEMENT SYSTEM",font=("Arial", 32, "bold"),bg='#4CAF50',fg='white').pack(pady=10)
+        self.show_frame("dashboard", self.build_dashboard)
+
+    def build_dashboard(self, frame):
+        """Build the main dashboard screen."""
+        tk.Label(frame, text="STUDENT MANAGEMENT SYSTEM",font=("Arial", 32, "bold"),bg='#4CAF50',fg='white').pack(pady=10)
+
+
+        tk.Button(frame, text="Add Student", command=self.add_student_window,bg='grey',font=('bold',10),width=10 , height=2).pack(pady=6)
+        tk.Button(frame, text="View Students", command=self.view_students,bg='orange',font=('bold', 10), width=10 , height=2).pack(pady=6)
+        tk.Button(frame, text="Bulk Grades", command=self.bulk_grades_window,bg='#2196F3',font=('bold', 10), width=10 , height=2).pack(pady=6)
+        tk.Button(frame, text="Modules", command=self.module_view_window,bg='#9C27B0',font=('bold', 10), width=10 , height=2).pack(pady=6)
+        tk.Button(frame, text="Import CSV", command=self.import_data,bg='#00BCD4',font=('bold', 10), width=10 , height=2).pack(pady=6)
+        tk.Button(frame, text="Snapshots", command=self.snapshots_window,bg='#FFC107',font=('bold', 10), width=10 , height=2).pack(pady=6)
+        tk.Button(frame, text="Archive", command=self.archive_window,bg='#795548',fg='white',font=('bold', 10), width=10 , height=2).pack(pady=6)
+        tk.Button(frame, text="Exit",command=self.on_close,bg='#DC3545',font=('bold', 10), width=8 , height=2 ).pack(pady=6)
+
+        self.load_status = tk.Label(frame, text="Loading data...", bg='#4CAF50', fg='white')
+        self.load_status.pack(side=tk.BOTTOM, pady=6)
+        self.load_progress = ttk.Progressbar(frame, length=300, maximum=100)
+        self.load_progress.pack(side=tk.BOTTOM)
+
+    def update_load_status(self):
+        """Show what the last load read and what dictionary encoding saved."""
+        report = self.db.load_report
+        self.load_status.configure(
+            text=f"Loaded {report['students']} students and {report['grades']} grades "
+                 f"({report['courses']} courses, {report['modules']} modules). "
+                 f"Dictionary encoding released {report['bytes_released'] / 1024:.1f} KB of duplicate strings, "
+                 f"{report['bytes_saved'] / 1024:.1f} KB net of its code tables.\n"
+                 f"Checked {report['rows_checked']} rows in {report['validation_ms']} ms; "
+                 f"{report['rejected']} rejected to {self.db.rejects_file}."
+        )
+
+    def import_data(self):
+        """Import students and grades from CSV files chosen by the user."""
+        if self.still_loading():
+            return
 
+        filetypes = [("CSV files", "*.csv"), ("All files", "*.*")]
+        students_path = filedialog.askopenfilename(title="Students CSV (cancel to skip)", filetypes=filetypes)
+        modules_path = filedialog.askopenfilename(title="Modules CSV (cancel to skip)", filetypes=filetypes)
+        if not students_path and not modules_path:
+            return
 
-        tk.Button(self.master, text="Add Student", command=self.add_student_window,bg='grey',font=('bold',10),width=10 , height=2).pack(pady=6)
-        tk.Button(self.master, text="View Students", command=self.view_students,bg='orange',font=('bold', 10), width=10 , height=2).pack(pady=6)
-        tk.Button(self.master, text="Exit",command=self.on_close,bg='#DC3545',font=('bold', 10), width=8 , height=2 ).pack(pady=6)
+        students, grades, rejected = self.db.import_csv(students_path or None, modules_path or None)
+        message = f"Imported {students} student(s) and {grades} grade(s)."
+        if self.db.pending_changes:
+            message += "\nThe import could not be saved yet; it will be saved with the next change."
+        if rejected:
+            message += f"\n{rejected} row(s) were rejected; see {self.db.rejects_file}."
+        messagebox.showinfo("Import", message)
 
     def add_student_window(self):
         """Window to add a new student."""
-        self.clear_window()
-        tk.Label(self.master, text="Add New Student", font=("Arial", 16)).pack(pady=10)
+        self.show_frame("add_student", self.build_add_student)
+
+        # Start every visit with an empty form
+        for entry in (self.student_id_entry, self.name_entry, self.age_entry,
+                      self.course_entry, self.phone_entry, self.module_entry, self.grade_entry):
+            entry.delete(0, tk.END)
+        self.temp_modules = []
+        self.update_module_listbox()
+
+    def build_add_student(self, frame):
+        """Build the add student screen."""
+        tk.Label(frame, text="Add New Student", font=("Arial", 16)).pack(pady=10)
 
         # Create a frame for student details
-        student_frame = tk.Frame(self.master)
+        student_frame = tk.Frame(frame)
         student_frame.pack(pady=5)
 
         # Student details
@@ -198,7 +1697,7 @@ class StudentManagementApp:
         self.phone_entry.grid(row=4, column=1, padx=5, pady=5)
 
         # Module addition section
-        module_frame = tk.LabelFrame(self.master, text="Add Modules", padx=10, pady=10)
+        module_frame = tk.LabelFrame(frame, text="Add Modules", padx=10, pady=10)
         module_frame.pack(pady=10, fill=tk.X, padx=20)
 
         tk.Label(module_frame, text="Module Name:").grid(row=0, column=0, padx=5, pady=5)
@@ -224,7 +1723,7 @@ class StudentManagementApp:
         tk.Button(button_frame, text="Remove Module", command=self.remove_temp_module,bg="#FF8C00",fg="white",  activebackground="#E67300",activeforeground="white",padx=10,pady=5).pack(side=tk.LEFT, padx=5)
 
         # Main buttons
-        main_button_frame = tk.Frame(self.master , bg='#e0e0e0')
+        main_button_frame = tk.Frame(frame , bg='#e0e0e0')
         main_button_frame.pack(pady=10)
 
         tk.Button(main_button_frame, text="Save Student", command=self.add_student_with_modules, bg='#2196F3',fg='white',activebackground='#0b7dda' ).pack(side=tk.LEFT, padx=5)
@@ -293,64 +1792,125 @@ class StudentManagementApp:
             messagebox.showerror("Error", "Age must be a positive integer!")
             return
 
-        if self.db.add_student(student_id, name, age, course, phone):
-            # Add all temporary modules to the database
-            for module, grade in self.temp_modules:
-                self.db.add_module(student_id, module, grade)
+        if self.still_loading():
+            return
+
+        if phone in self.db.phone_index:
+            messagebox.showerror("Error", f"Phone number already belongs to student {self.db.phone_index[phone]}!")
+            return
+
+        if student_id in self.db.archive_index:
+            messagebox.showerror("Error", "Student ID belongs to an archived student; restore them from the Archive screen instead!")
+            return
+
+        if student_id in self.db.students:
+            messagebox.showerror("Error", "Student ID already exists!")
+            return
+
+        saved = self.db.add_student(student_id, name, age, course, phone)
+        # Add all temporary modules to the database; each save retries the ones before
+        for module, grade in self.temp_modules:
+            saved = self.db.add_module(student_id, module, grade)
 
+        if saved:
             messagebox.showinfo("Success", "Student and modules added successfully!")
-            self.create_dashboard()
         else:
-            messagebox.showerror("Error", "Student ID already exists!")
+            self.report_failure("Failed to add student")
+        if student_id in self.db.students:
+            self.create_dashboard()
 
     def view_students(self):
         """View students with filtering options."""
-        self.clear_window()
-        tk.Label(self.master, text="Student List", font=("Arial", 16)).pack(pady=10)
+        self.show_frame("view_students", self.build_view_students)
+
+    def build_view_students(self, frame):
+        """Build the student list screen and fill it once."""
+        tk.Label(frame, text="Student List", font=("Arial", 16)).pack(pady=10)
 
         # ===== FILTER CONTROLS =====
-        filter_frame = tk.Frame(self.master, bg='#f0f0f0')
+        filter_frame = tk.Frame(frame, bg='#f0f0f0')
         filter_frame.pack(fill=tk.X, padx=20, pady=10)
 
         tk.Label(filter_frame, text="Filter by Course:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
 
-        # Get all unique courses from students
-        courses = set()
-        for student in self.db.get_students():
-            courses.add(student[3])  # course is at index 3
-        courses = sorted(list(courses))  # Convert to sorted list
-        courses.insert(0, "All")  # Add "All" option at beginning
-
         self.course_filter_var = tk.StringVar(value="All")  # Default value
 
         # Create the dropdown (Combobox)
-        course_dropdown = ttk.Combobox(
+        self.course_dropdown = ttk.Combobox(
             filter_frame,
             textvariable=self.course_filter_var,
-            values=courses,
             state="readonly",  # Prevent typing
             width=25
         )
-        course_dropdown.pack(side=tk.LEFT, padx=5)
+        self.course_dropdown.pack(side=tk.LEFT, padx=5)
+        self.update_course_choices()
 
         # Filter button
         filter_btn = tk.Button(
             filter_frame,
             text="Apply Filter",
-            command=self.apply_course_filter,
+            command=self.apply_filters,
             bg="#4CAF50",
             fg="white"
         )
         filter_btn.pack(side=tk.LEFT, padx=5)
+
+        tk.Label(filter_frame, text="GPA Scale:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+        self.scale_var = tk.StringVar(value=self.db.gpa_engine.scale.name)
+        scale_dropdown = ttk.Combobox(
+            filter_frame,
+            textvariable=self.scale_var,
+            values=self.db.gpa_engine.scale_names(),
+            state="readonly",
+            width=15
+        )
+        scale_dropdown.pack(side=tk.LEFT, padx=5)
+        scale_dropdown.bind("<<ComboboxSelected>>", lambda e: self.db.set_grading_scale(self.scale_var.get()))
+
+        # Extra criteria; all of them must match
+        criteria_frame = tk.Frame(frame, bg='#f0f0f0')
+        criteria_frame.pack(fill=tk.X, padx=20)
+        self.criteria = {}
+        for label, key in (("GPA", "gpa"), ("Age", "age")):
+            tk.Label(criteria_frame, text=f"{label}:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+            op_var = tk.StringVar(value=">=")
+            ttk.Combobox(criteria_frame, textvariable=op_var, values=list(OPERATORS), state="readonly", width=3).pack(side=tk.LEFT)
+            value_entry = tk.Entry(criteria_frame, width=6)
+            value_entry.pack(side=tk.LEFT, padx=2)
+            self.criteria[key] = (op_var, value_entry)
+
+        tk.Label(criteria_frame, text="Took Module:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+        self.module_filter_entry = tk.Entry(criteria_frame, width=10)
+        self.module_filter_entry.pack(side=tk.LEFT)
+        tk.Label(criteria_frame, text="Grade:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+        op_var = tk.StringVar(value="<")
+        ttk.Combobox(criteria_frame, textvariable=op_var, values=list(OPERATORS), state="readonly", width=3).pack(side=tk.LEFT)
+        value_entry = tk.Entry(criteria_frame, width=6)
+        value_entry.pack(side=tk.LEFT, padx=2)
+        self.criteria["module_grade"] = (op_var, value_entry)
+
+        # Look-up by ID also finds archived students
+        find_frame = tk.Frame(frame, bg='#f0f0f0')
+        find_frame.pack(fill=tk.X, padx=20, pady=5)
+        tk.Label(find_frame, text="Find Student ID:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+        self.find_entry = tk.Entry(find_frame, width=12)
+        self.find_entry.pack(side=tk.LEFT, padx=5)
+        tk.Button(find_frame, text="Find", command=self.find_student, bg="#4CAF50", fg="white").pack(side=tk.LEFT, padx=5)
+
+        self.plan_label = tk.Label(frame, text="", bg='#4CAF50', fg='white')
+        self.plan_label.pack()
+        self.active_filter = None
         # ================= END FILTER CONTROLS ================
 
-        # Create the student table
-        self.tree = ttk.Treeview(self.master, columns=("ID", "Name", "Age", "Course", "Phone", "GPA"), show="headings")
+        # Create the student table, one row per student keyed by student_id
+        self.tree = ttk.Treeview(frame, columns=("ID", "Name", "Age", "Course", "Phone", "GPA"), show="headings")
         for col in ("ID", "Name", "Age", "Course", "Phone", "GPA"):
-            self.tree.heading(col, text=col)
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_students(c.lower()))
+        self.sort_column = None
+        self.sort_descending = False
 
         # Apply initial filter (show all)
-        self.apply_course_filter()
+        self.apply_filters()
 
         # Add bindings
         self.tree.bind("<Double-1>", self.student_options)
@@ -359,13 +1919,19 @@ class StudentManagementApp:
 
         # Back button
         tk.Button(
-            self.master,
+            frame,
             text="Back",
             command=self.create_dashboard,
             bg="#FF8C00",
             fg="white"
         ).pack(pady=10)
 
+    def update_course_choices(self):
+        """Refresh the course dropdown from the current students."""
+        courses = self.db.get_courses()
+        courses.insert(0, "All")  # Add "All" option at beginning
+        self.course_dropdown.configure(values=courses)
+
     def show_context_menu(self, event):
         """Show context menu on right-click with delete and update options."""
         # Identify the item that was right-clicked
@@ -378,35 +1944,121 @@ class StudentManagementApp:
             menu = tk.Menu(self.master, tearoff=0)
             menu.add_command(label="Update Modules/Grades",
                              command=lambda: self.manage_modules(self.tree.item(item, "values")[0]))
+            menu.add_command(label="Archive Student", command=lambda: self.archive_student(self.tree.item(item, "values")[0]))
             menu.add_command(label="Delete Student", command=lambda: self.delete_student(self.tree, item))
             menu.post(event.x_root, event.y_root)
 
-    def apply_course_filter(self):
-        """Apply the selected course filter to the student list."""
+    def matches_filters(self, student_id):
+        """Check a student against the filter currently shown."""
+        return self.active_filter is None or self.active_filter.matches(self.db, student_id)
+
+    def build_filter(self):
+        """Combine the filter bar into one predicate (None shows everyone)."""
+        parts = []
         selected_course = self.course_filter_var.get()
+        if selected_course != "All":
+            parts.append(Where("course", "==", selected_course))
+
+        for key in ("gpa", "age"):
+            op_var, value_entry = self.criteria[key]
+            value = value_entry.get().strip()
+            if value:
+                parts.append(Where(key, op_var.get(), float(value)))
+
+        module_name = self.module_filter_entry.get().strip()
+        op_var, value_entry = self.criteria["module_grade"]
+        grade = value_entry.get().strip()
+        if module_name:
+            if grade:
+                parts.append(TookModule(module_name, op_var.get(), float(grade)))
+            else:
+                parts.append(TookModule(module_name))
+
+        if not parts:
+            return None
+        return And(*parts) if len(parts) > 1 else parts[0]
+
+    def apply_filters(self):
+        """Apply the filter bar to the student list through Database.query."""
+        try:
+            self.active_filter = self.build_filter()
+        except ValueError:
+            messagebox.showerror("Error", "GPA, age and grade filters must be numbers!")
+            return
+
+        rows = self.db.select(self.active_filter, self.sort_column, self.sort_descending)
+        stats = self.db.query_cache_stats
+        status = f"Cache: {stats['hits']} hits, {stats['misses']} misses"
+        plan = self.db.last_plan
+        if plan is not None:
+            status = (f"Plan: {plan['index']} ({plan['estimated_rows']} candidates), "
+                      f"then check {len(plan['filters'])} more condition(s). " + status)
+        self.plan_label.configure(text=status)
 
         # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
 
         # Add filtered students
-        for student in self.db.get_students():
-            student_id, name, age, course, phone = student[:5]
+        for row in rows:
+            self.tree.insert("", "end", iid=row[0], values=row)
 
-            # Show all or matching courses (case-insensitive)
-            if selected_course == "All" or course.lower() == selected_course.lower():
-                gpa = self.db.calculate_gpa(student_id)
-                self.tree.insert("", "end", values=(student_id, name, age, course, phone, gpa))
+    def sort_students(self, column):
+        """Sort the student list by a column; clicking it again reverses the order."""
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = False
+        self.apply_filters()
+
+    def refresh_student_row(self, student_id):
+        """Insert, update or drop a single row of the student table."""
+        data = self.db.students.get(student_id)
+        if data is None or not self.matches_filters(student_id):
+            if self.tree.exists(student_id):
+                self.tree.delete(student_id)
+            return
+
+        values = (student_id, *data, self.db.calculate_gpa(student_id))
+        if self.tree.exists(student_id):
+            self.tree.item(student_id, values=values)
+        else:
+            self.tree.insert("", "end", iid=student_id, values=values)
+
+    def find_student(self):
+        """Find a student by ID in the list, or offer to restore them from the archive."""
+        student_id = self.find_entry.get().strip()
+        student = self.db.find_student(student_id)
+        if student is None:
+            messagebox.showerror("Error", f"No student with ID {student_id}")
+            return
+
+        name, status = student[1], student[5]
+        if status == "active":
+            if self.tree.exists(student_id):
+                self.tree.selection_set(student_id)
+                self.tree.see(student_id)
+            else:
+                messagebox.showinfo("Find Student", f"{name} ({student_id}) is hidden by the current filter.")
+        elif messagebox.askyesno("Archived Student", f"{name} ({student_id}) is archived as {status}. Restore them?"):
+            if self.still_loading():
+                return
+            if self.db.restore_student(student_id):
+                messagebox.showinfo("Success", "Student restored successfully!")
+            else:
+                messagebox.showerror("Error", "Failed to restore student (phone number already in use, or it could not be saved)")
 
     def delete_student(self, tree, item):
         """Delete the selected student."""
         student_id = tree.item(item, "values")[0]
+        if self.still_loading():
+            return
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete student {student_id}?"):
+            # The student table drops the row when the database notifies us
             if self.db.delete_student(student_id):
                 messagebox.showinfo("Success", "Student deleted successfully!")
-                self.view_students()  # Refresh the view
             else:
-                messagebox.showerror("Error", "Failed to delete student")
+                self.report_failure("Failed to delete student")
 
     def student_options(self, event):
         """Handle double-click to manage modules."""
@@ -416,41 +2068,52 @@ class StudentManagementApp:
 
     def manage_modules(self, student_id):
         """Module management window."""
-        self.clear_window()
+        self.show_frame("manage_modules", self.build_manage_modules)
+        self.current_student_id = student_id
         student = self.db.students.get(student_id, ["Unknown"])
-        tk.Label(self.master, text=f"Manage Modules for {student[0]} (ID: {student_id})", font=("Arial", 16)).pack(pady=10)
+        self.manage_title.configure(text=f"Manage Modules for {student[0]} (ID: {student_id})")
+        self.manage_module_entry.delete(0, tk.END)
+        self.manage_grade_entry.delete(0, tk.END)
+        self.refresh_module_tree()
+
+    def build_manage_modules(self, frame):
+        """Build the module management screen; it is reused for every student."""
+        self.manage_title = tk.Label(frame, font=("Arial", 16))
+        self.manage_title.pack(pady=10)
 
         # Module List
-        self.module_tree = ttk.Treeview(self.master, columns=("Module", "Grade"), show="headings")
+        self.module_tree = ttk.Treeview(frame, columns=("Module", "Grade"), show="headings")
         self.module_tree.heading("Module", text="Module")
         self.module_tree.heading("Grade", text="Grade")
-
-        for module in self.db.get_modules(student_id):
-            self.module_tree.insert("", "end", values=module)
-
         self.module_tree.pack(expand=True, fill=tk.BOTH, padx=20, pady=10)
 
         # Bind right-click on module tree
-        self.module_tree.bind("<Button-3>", lambda e: self.show_module_context_menu(e, student_id))
+        self.module_tree.bind("<Button-3>", lambda e: self.show_module_context_menu(e, self.current_student_id))
 
         # Add Module
-        add_frame = tk.Frame(self.master)
+        add_frame = tk.Frame(frame)
         add_frame.pack(pady=10)
 
         tk.Label(add_frame, text="Module Name:").pack(side=tk.LEFT)
-        self.module_entry = tk.Entry(add_frame)
-        self.module_entry.pack(side=tk.LEFT, padx=5)
+        self.manage_module_entry = tk.Entry(add_frame)
+        self.manage_module_entry.pack(side=tk.LEFT, padx=5)
 
         tk.Label(add_frame, text="Grade:").pack(side=tk.LEFT)
-        self.grade_entry = tk.Entry(add_frame)
-        self.grade_entry.pack(side=tk.LEFT, padx=5)
+        self.manage_grade_entry = tk.Entry(add_frame)
+        self.manage_grade_entry.pack(side=tk.LEFT, padx=5)
 
-        button_frame = tk.Frame(self.master)
+        button_frame = tk.Frame(frame)
         button_frame.pack(pady=10)
 
-        tk.Button(button_frame, text="Add Module", command=lambda: self.add_module(student_id) ).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Add Module", command=lambda: self.add_module(self.current_student_id) ).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Back", command=self.view_students).pack(side=tk.LEFT, padx=5)
 
+    def refresh_module_tree(self):
+        """Show the modules of the student being managed."""
+        self.module_tree.delete(*self.module_tree.get_children())
+        for module in self.db.get_modules(self.current_student_id):
+            self.module_tree.insert("", "end", values=module)
+
     def show_module_context_menu(self, event, student_id):
         """Show context menu for modules to update grades."""
         item = self.module_tree.identify_row(event.y)
@@ -472,6 +2135,9 @@ class StudentManagementApp:
 
     def update_module_grade(self, student_id, module_name):
         """Update a module's grade for a student."""
+        if self.still_loading():
+            return
+
         # Ask for new grade
         new_grade = simpledialog.askfloat(
             "Update Grade",
@@ -483,32 +2149,361 @@ class StudentManagementApp:
         if new_grade is not None:  # User didn't cancel
             if self.db.update_module_grade(student_id, module_name, new_grade):
                 messagebox.showinfo("Success", "Grade updated successfully!")
-                self.manage_modules(student_id)  # Refresh the view
             else:
-                messagebox.showerror("Error", "Failed to update grade")
+                self.report_failure("Failed to update grade")
 
     def add_module(self, student_id):
         """Add a module to the student's record."""
-        module_name = self.module_entry.get()
+        if self.still_loading():
+            return
+        module_name = self.manage_module_entry.get()
         try:
-            grade = float(self.grade_entry.get())
-            if 0 <= grade <= 100:
-                self.db.add_module(student_id, module_name, grade)
+            grade = float(self.manage_grade_entry.get())
+            if not 0 <= grade <= 100:
+                messagebox.showerror("Error", "Grade must be between 0 and 100!")
+            elif self.db.add_module(student_id, module_name, grade):
                 messagebox.showinfo("Success", "Module added successfully!")
-                self.manage_modules(student_id)
+                self.manage_module_entry.delete(0, tk.END)
+                self.manage_grade_entry.delete(0, tk.END)
             else:
-                messagebox.showerror("Error", "Grade must be between 0 and 100!")
+                self.report_failure("Failed to add module")
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid numeric grade!")
 
-    def clear_window(self):
-        """Clear all widgets from the window."""
-        for widget in self.master.winfo_children():
+    def bulk_grades_window(self):
+        """Spreadsheet-style grade entry for one module across a course."""
+        self.show_frame("bulk_grades", self.build_bulk_grades)
+        self.update_bulk_choices()
+
+    def build_bulk_grades(self, frame):
+        """Build the bulk grade entry screen."""
+        tk.Label(frame, text="Bulk Grade Entry", font=("Arial", 16)).pack(pady=10)
+
+        # Module and course selection
+        select_frame = tk.Frame(frame, bg='#f0f0f0')
+        select_frame.pack(fill=tk.X, padx=20, pady=10)
+
+        tk.Label(select_frame, text="Module:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+        self.bulk_module_var = tk.StringVar()
+        self.bulk_module_dropdown = ttk.Combobox(select_frame, textvariable=self.bulk_module_var, width=20)
+        self.bulk_module_dropdown.pack(side=tk.LEFT, padx=5)
+
+        tk.Label(select_frame, text="Course:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+        self.bulk_course_var = tk.StringVar()
+        self.bulk_course_dropdown = ttk.Combobox(select_frame, textvariable=self.bulk_course_var, state="readonly", width=15)
+        self.bulk_course_dropdown.pack(side=tk.LEFT, padx=5)
+
+        tk.Button(select_frame, text="Load Class", command=self.load_bulk_grid, bg="#4CAF50", fg="white").pack(side=tk.LEFT, padx=5)
+
+        # Scrollable grid of one row per student
+        grid_frame = tk.Frame(frame)
+        grid_frame.pack(expand=True, fill=tk.BOTH, padx=20, pady=10)
+        canvas = tk.Canvas(grid_frame, highlightthickness=0)
+        scrollbar = tk.Scrollbar(grid_frame, orient=tk.VERTICAL, command=canvas.yview)
+        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        canvas.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+
+        self.bulk_grid = tk.Frame(canvas)
+        canvas.create_window((0, 0), window=self.bulk_grid, anchor='nw')
+        self.bulk_grid.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+        self.bulk_entries = {}  # {student_id: Entry}
+        self.bulk_grades = {}  # {student_id: grade stored when the grid was filled}
+        self.bulk_module_name = None
+
+        button_frame = tk.Frame(frame)
+        button_frame.pack(pady=10)
+
+        tk.Button(button_frame, text="Save All Grades", command=self.save_bulk_grades, bg='#2196F3', fg='white', activebackground='#0b7dda').pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Back", command=self.create_dashboard, bg='#607d8b', fg='white', activebackground='#455a64').pack(side=tk.LEFT, padx=5)
+
+    def update_bulk_choices(self):
+        """Refresh the module and course dropdowns of the bulk screen."""
+        self.bulk_module_dropdown.configure(values=self.db.get_module_names())
+        self.bulk_course_dropdown.configure(values=self.db.get_courses())
+
+    def load_bulk_grid(self):
+        """Fill the grid with every student of the selected course."""
+        module_name = self.bulk_module_var.get().strip()
+        course = self.bulk_course_var.get()
+        if not module_name or not course:
+            messagebox.showerror("Error", "Select both a module and a course!")
+            return
+
+        for widget in self.bulk_grid.winfo_children():
             widget.destroy()
+        self.bulk_entries = {}
+        self.bulk_grades = {}
+        self.bulk_module_name = module_name
+
+        for col, heading in enumerate(("ID", "Name", "Grade")):
+            tk.Label(self.bulk_grid, text=heading, font=('bold', 10)).grid(row=0, column=col, sticky='w', padx=5, pady=2)
+
+        row = 1
+        for student_id, name, _, _, _ in self.db.query(Where("course", "==", course)):
+            tk.Label(self.bulk_grid, text=student_id).grid(row=row, column=0, sticky='w', padx=5)
+            tk.Label(self.bulk_grid, text=name).grid(row=row, column=1, sticky='w', padx=5)
+            entry = tk.Entry(self.bulk_grid, width=10)
+            entry.grid(row=row, column=2, padx=5, pady=1)
+            for mod_name, grade in self.db.get_modules(student_id):
+                if self.db.normalise_module(mod_name) == self.db.normalise_module(module_name):
+                    entry.insert(0, grade)
+                    self.bulk_grades[student_id] = grade
+                    break
+            self.bulk_entries[student_id] = entry
+            row += 1
+
+        if not self.bulk_entries:
+            messagebox.showinfo("Info", f"No students are enrolled in {course}.")
+
+    def save_bulk_grades(self):
+        """Validate every grade in the grid and commit the changed ones in one write."""
+        if not self.bulk_entries:
+            messagebox.showerror("Error", "Load a class first!")
+            return
+        if self.still_loading():
+            return
+
+        grades = {}
+        invalid = []
+        for student_id, entry in self.bulk_entries.items():
+            value = entry.get().strip()
+            entry.configure(bg='white')
+            if not value:
+                continue  # Blank cells are left untouched
+            try:
+                grade = float(value)
+                if not (0 <= grade <= 100):
+                    raise ValueError
+                if grade != self.bulk_grades.get(student_id):
+                    grades[student_id] = grade  # Unedited cells are not saved again
+            except ValueError:
+                entry.configure(bg='#ffcccc')
+                invalid.append(student_id)
+
+        # Nothing is written unless the whole batch is valid
+        if invalid:
+            messagebox.showerror("Error", f"Grades must be numbers between 0 and 100! Check {len(invalid)} highlighted row(s).")
+            return
+
+        count = self.db.set_module_grades(self.bulk_module_name, grades)
+        self.bulk_grades.update(grades)
+        if grades and not count:
+            self.report_failure("No grades were saved")
+            return
+        messagebox.showinfo("Success", f"Saved {self.bulk_module_name} grades for {count} student(s)!")
+
+    def module_view_window(self):
+        """Module view: who took a module, who failed it and its average."""
+        self.show_frame("module_view", self.build_module_view)
+        self.module_view_dropdown.configure(values=self.db.get_module_names())
+
+    def build_module_view(self, frame):
+        """Build the module view screen."""
+        tk.Label(frame, text="Module View", font=("Arial", 16)).pack(pady=10)
+
+        select_frame = tk.Frame(frame, bg='#f0f0f0')
+        select_frame.pack(fill=tk.X, padx=20, pady=10)
+
+        tk.Label(select_frame, text="Module:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+        self.module_view_var = tk.StringVar()
+        self.module_view_dropdown = ttk.Combobox(select_frame, textvariable=self.module_view_var, state="readonly", width=20)
+        self.module_view_dropdown.pack(side=tk.LEFT, padx=5)
+
+        self.failures_only_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(select_frame, text="Failures only", variable=self.failures_only_var, bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+
+        tk.Button(select_frame, text="Show", command=self.apply_module_view, bg="#4CAF50", fg="white").pack(side=tk.LEFT, padx=5)
+
+        self.module_summary = tk.Label(frame, text="", bg='#4CAF50', fg='white')
+        self.module_summary.pack()
+
+        self.module_view_tree = ttk.Treeview(frame, columns=("ID", "Name", "Course", "Grade"), show="headings")
+        for col in ("ID", "Name", "Course", "Grade"):
+            self.module_view_tree.heading(col, text=col)
+        self.module_view_tree.pack(expand=True, fill=tk.BOTH, padx=20, pady=10)
+
+        tk.Button(frame, text="Back", command=self.create_dashboard, bg="#FF8C00", fg="white").pack(pady=10)
+
+    def apply_module_view(self):
+        """Show the students of the selected module using the module index."""
+        module_name = self.module_view_var.get()
+        self.module_view_tree.delete(*self.module_view_tree.get_children())
+        if not module_name:
+            self.module_summary.configure(text="")
+            return
+
+        if self.failures_only_var.get():
+            entries = self.db.get_module_failures(module_name)
+        else:
+            entries = self.db.get_module_students(module_name)
+
+        for student_id, grade in entries:
+            name, _, course, _ = self.db.students.get(student_id, ["Unknown", "", "", ""])
+            self.module_view_tree.insert("", "end", values=(student_id, name, course, grade))
+
+        enrolled = len(self.db.get_module_students(module_name))
+        failed = len(self.db.get_module_failures(module_name))
+        average = self.db.get_module_average(module_name)
+        pass_mark = self.db.gpa_engine.scale.pass_mark()
+        self.module_summary.configure(text=f"Enrolled: {enrolled}    Failed (below {pass_mark:g}): {failed}    Average: {average}")
+
+    def snapshots_window(self):
+        """Take and browse read-only point-in-time snapshots."""
+        self.show_frame("snapshots", self.build_snapshots)
+        self.refresh_snapshot_list()
+
+    def build_snapshots(self, frame):
+        """Build the snapshots screen."""
+        tk.Label(frame, text="Snapshots", font=("Arial", 16)).pack(pady=10)
+
+        take_frame = tk.Frame(frame, bg='#f0f0f0')
+        take_frame.pack(fill=tk.X, padx=20, pady=10)
+
+        tk.Label(take_frame, text="Snapshot Name:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+        self.snapshot_name_entry = tk.Entry(take_frame)
+        self.snapshot_name_entry.pack(side=tk.LEFT, padx=5)
+        tk.Button(take_frame, text="Take Snapshot", command=self.take_snapshot, bg="#4CAF50", fg="white").pack(side=tk.LEFT, padx=5)
+
+        tk.Label(take_frame, text="View:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+        self.snapshot_var = tk.StringVar()
+        self.snapshot_dropdown = ttk.Combobox(take_frame, textvariable=self.snapshot_var, state="readonly", width=15)
+        self.snapshot_dropdown.pack(side=tk.LEFT, padx=5)
+        self.snapshot_dropdown.bind("<<ComboboxSelected>>", lambda e: self.show_snapshot())
+
+        self.snapshot_tree = ttk.Treeview(frame, columns=("ID", "Name", "Age", "Course", "Phone", "GPA"), show="headings")
+        for col in ("ID", "Name", "Age", "Course", "Phone", "GPA"):
+            self.snapshot_tree.heading(col, text=col)
+        self.snapshot_tree.pack(expand=True, fill=tk.BOTH, padx=20, pady=5)
+        self.snapshot_tree.bind("<<TreeviewSelect>>", lambda e: self.show_snapshot_modules())
+
+        self.snapshot_module_tree = ttk.Treeview(frame, columns=("Module", "Grade"), show="headings", height=5)
+        self.snapshot_module_tree.heading("Module", text="Module")
+        self.snapshot_module_tree.heading("Grade", text="Grade")
+        self.snapshot_module_tree.pack(fill=tk.X, padx=20, pady=5)
+
+        tk.Button(frame, text="Back", command=self.create_dashboard, bg="#FF8C00", fg="white").pack(pady=10)
+
+    def refresh_snapshot_list(self):
+        """Refresh the snapshot dropdown."""
+        self.snapshot_dropdown.configure(values=[name for name, _ in self.db.list_snapshots()])
+
+    def take_snapshot(self):
+        """Take a snapshot with the name entered."""
+        name = self.snapshot_name_entry.get().strip()
+        if self.still_loading():
+            return
+        if self.db.create_snapshot(name):
+            messagebox.showinfo("Success", f"Snapshot {name} taken!")
+            self.snapshot_name_entry.delete(0, tk.END)
+            self.refresh_snapshot_list()
+        else:
+            messagebox.showerror("Error", "Snapshot names must be unique and use only letters, digits, - and _!")
+
+    def show_snapshot(self):
+        """Show the students of the selected snapshot."""
+        snapshot = self.db.get_snapshot(self.snapshot_var.get())
+        self.snapshot_tree.delete(*self.snapshot_tree.get_children())
+        self.snapshot_module_tree.delete(*self.snapshot_module_tree.get_children())
+        if snapshot is None:
+            return
+        for student in snapshot.get_students():
+            self.snapshot_tree.insert("", "end", iid=student[0], values=(*student, snapshot.calculate_gpa(student[0])))
+
+    def show_snapshot_modules(self):
+        """Show the modules of the student selected in the snapshot."""
+        snapshot = self.db.get_snapshot(self.snapshot_var.get())
+        self.snapshot_module_tree.delete(*self.snapshot_module_tree.get_children())
+        selection = self.snapshot_tree.selection()
+        if snapshot is None or not selection:
+            return
+        for module in snapshot.get_modules(selection[0]):
+            self.snapshot_module_tree.insert("", "end", values=module)
+
+    def archive_student(self, student_id):
+        """Move the selected student to the archive."""
+        if self.still_loading():
+            return
+        status = simpledialog.askstring("Archive Student", f"Status for student {student_id}:", initialvalue="graduated")
+        if status is None:  # User cancelled
+            return
+        if self.db.archive_student(student_id, status.strip() or "inactive"):
+            messagebox.showinfo("Success", "Student archived successfully!")
+        else:
+            messagebox.showerror("Error", "Failed to archive student")
+
+    def archive_window(self):
+        """Search and restore archived students."""
+        self.show_frame("archive", self.build_archive)
+
+    def build_archive(self, frame):
+        """Build the archive screen."""
+        tk.Label(frame, text="Archived Students", font=("Arial", 16)).pack(pady=10)
+
+        search_frame = tk.Frame(frame, bg='#f0f0f0')
+        search_frame.pack(fill=tk.X, padx=20, pady=10)
+
+        tk.Label(search_frame, text="Student ID:", bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+        self.archive_search_entry = tk.Entry(search_frame)
+        self.archive_search_entry.pack(side=tk.LEFT, padx=5)
+        tk.Button(search_frame, text="Search", command=self.search_archive, bg="#4CAF50", fg="white").pack(side=tk.LEFT, padx=5)
+
+        self.archive_tree = ttk.Treeview(frame, columns=("ID", "Name", "Course", "Grades", "Status", "Archived"), show="headings")
+        for col in ("ID", "Name", "Course", "Grades", "Status", "Archived"):
+            self.archive_tree.heading(col, text=col)
+        self.archive_tree.pack(expand=True, fill=tk.BOTH, padx=20, pady=10)
+
+        button_frame = tk.Frame(frame)
+        button_frame.pack(pady=10)
+
+        tk.Button(button_frame, text="Restore", command=self.restore_student, bg='#2196F3', fg='white').pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Back", command=self.create_dashboard, bg='#607d8b', fg='white').pack(side=tk.LEFT, padx=5)
+
+    def search_archive(self):
+        """List the archived students whose ID contains the search text."""
+        self.archive_tree.delete(*self.archive_tree.get_children())
+        for record in self.db.search_archive(self.archive_search_entry.get().strip()):
+            name, _, course, _ = record["student"]
+            self.archive_tree.insert("", "end", iid=record["student_id"], values=(
+                record["student_id"], name, course, len(record["modules"]), record["status"], record["archived_at"]))
+
+    def restore_student(self):
+        """Restore the selected archived student."""
+        selection = self.archive_tree.selection()
+        if not selection:
+            messagebox.showerror("Error", "Please select a student to restore")
+            return
+        student_id = selection[0]
+        if self.still_loading():
+            return
+        if self.db.restore_student(student_id):
+            self.archive_tree.delete(student_id)
+            messagebox.showinfo("Success", "Student restored successfully!")
+        else:
+            messagebox.showerror("Error", "Failed to restore student (phone number already in use, or it could not be saved)")
 
 
 # Run Application
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = StudentManagementApp(root)
-    root.mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Student Management System")
+    parser.add_argument("--export-changes", metavar="FILE",
+                        help="write the change feed to FILE as CSV instead of starting the GUI")
+    parser.add_argument("--since", type=int, default=0, metavar="SEQ",
+                        help="only export changes after this sequence number")
+    parser.add_argument("--since-time", metavar="TIMESTAMP",
+                        help="only export changes at or after this UTC time, e.g. 2026-10-19T00:00:00Z")
+    args = parser.parse_args()
+    if args.since_time is not None:
+        try:
+            Database.normalise_change_time(args.since_time)
+        except ValueError:
+            parser.error(f"invalid --since-time {args.since_time!r}; expected e.g. 2026-10-19T00:00:00Z")
+
+    if args.export_changes:
+        # Only the change feed is read; the student data is not loaded
+        last_seq = Database(autoload=False).export_changes(args.export_changes, args.since, args.since_time)
+        print(f"Exported changes up to sequence {last_seq}")
+    else:
+        root = tk.Tk()
+        app = StudentManagementApp(root)
+        root.mainloop()
@@ -0,0 +1,132 @@
+import bisect
+import json
+import os
+
+
+# Used when there is no config file: the original 4.0 ladder
+DEFAULT_SCALES = {
+    "default": "four_point",
+    "scales": {
+        "four_point": {"bands": [[90, 4.0], [80, 3.0], [70, 2.0], [60, 1.0], [0, 0.0]]},
+    },
+    "credits": {},
+}
+
+
+def is_number(value):
+    """True for JSON numbers (bools excluded)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class GradingScale:
+    """A grading scale compiled into a bisect lookup table."""
+
+    def __init__(self, name, bands, credits=None, description=""):
+        """bands is [[min_mark, points], ...]; credits is {module_name: weight}.
+
+        Raises ValueError if either is malformed.
+        """
+        if not isinstance(bands, list) or not bands:
+            raise ValueError(f"Grading scale '{name}' needs a non-empty list of bands")
+        for band in bands:
+            if not isinstance(band, (list, tuple)) or len(band) != 2 or not all(is_number(value) for value in band):
+                raise ValueError(f"Grading scale '{name}' has a bad band {band!r}; expected [min_mark, points]")
+        credits = credits or {}
+        if not isinstance(credits, dict) or not all(is_number(weight) for weight in credits.values()):
+            raise ValueError(f"Grading scale '{name}' needs credits as {{module_name: weight}}")
+        bands = sorted((float(mark), float(points)) for mark, points in bands)
+        self.name = name
+        self.description = description
+        self.thresholds = [mark for mark, _ in bands]
+        self.points = [points for _, points in bands]
+        self.credits = {module.strip().upper(): float(weight) for module, weight in credits.items()}
+
+    def grade_points(self, grade):
+        """Grade points for one mark; marks below the lowest band score 0."""
+        i = bisect.bisect_right(self.thresholds, grade) - 1
+        return self.points[i] if i >= 0 else 0.0
+
+    def pass_mark(self):
+        """Lowest mark that earns any grade points (inf if none does)."""
+        for mark, points in zip(self.thresholds, self.points):
+            if points > 0:
+                return mark
+        return float("inf")
+
+    def gpa(self, modules):
+        """Credit-weighted GPA of [(module_name, grade), ...]."""
+        thresholds, points, credits = self.thresholds, self.points, self.credits
+        total_points = 0.0
+        total_credits = 0.0
+        for module_name, grade in modules:
+            weight = credits.get(module_name.strip().upper(), 1.0) if credits else 1.0
+            i = bisect.bisect_right(thresholds, grade) - 1
+            total_points += (points[i] if i >= 0 else 0.0) * weight
+            total_credits += weight
+        if not total_credits:
+            return 0.0
+        return round(total_points / total_credits, 2)
+
+
+class GpaEngine:
+    """Loads grading scales from a JSON config file and scores students with them."""
+
+    def __init__(self, config_file="grading_scales.json"):
+        """Load the scales and select the default one."""
+        self.config_file = config_file
+        self.scales = {}
+        self.scale = None
+        self.load_config()
+
+    def load_config(self):
+        """Read and compile every scale in the config file.
+
+        Raises ValueError if the file is malformed or not shaped like
+        DEFAULT_SCALES; a missing file (or no config_file at all) falls back
+        to the built-in 4.0 scale.
+        """
+        config = DEFAULT_SCALES
+        if self.config_file and os.path.exists(self.config_file):
+            try:
+                with open(self.config_file, 'r') as f:
+                    config = json.load(f)
+            except (IOError, ValueError) as e:
+                raise ValueError(f"Failed to read grading scales: {str(e)}")
+
+        if not isinstance(config, dict) or not isinstance(config.get("scales", {}), dict):
+            raise ValueError("Grading scales config must be an object with a 'scales' object")
+        credits = config.get("credits", {})
+        scales = {}
+        for name, spec in config.get("scales", {}).items():
+            if not isinstance(spec, dict):
+                raise ValueError(f"Grading scale '{name}' must be an object with 'bands'")
+            # A scale may override the shared module credits
+            scales[name] = GradingScale(name, spec.get("bands", []), spec.get("credits", credits),
+                                        spec.get("description", ""))
+        if not scales:
+            raise ValueError("No grading scales defined")
+
+        default = config.get("default", next(iter(scales)))
+        if not isinstance(default, str) or default not in scales:
+            raise ValueError(f"Unknown default grading scale '{default}'")
+        self.scales = scales
+        self.scale = scales[default]
+
+    def scale_names(self):
+        """Names of every loaded scale."""
+        return list(self.scales)
+
+    def use_scale(self, name):
+        """Switch the scale used by calculate and calculate_many."""
+        if name not in self.scales:
+            raise ValueError(f"Unknown grading scale '{name}'")
+        self.scale = self.scales[name]
+
+    def calculate(self, modules):
+        """GPA of one student's [(module_name, grade), ...]."""
+        return self.scale.gpa(modules)
+
+    def calculate_many(self, modules_by_student):
+        """GPAs of many students in one pass: {student_id: [(module_name, grade), ...]} -> {student_id: gpa}."""
+        gpa = self.scale.gpa
+        return {student_id: gpa(modules) for student_id, modules in modules_by_student.items()}
@@ -0,0 +1,225 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import Database
+
+
+STUDENTS = [
+    ("101", "ALICE", "20", "BSC", "0991000001"),
+    ("102", "BOB", "21", "BSC", "0991000002"),
+    ("103", "CAROL", "22", "BA", "0991000003"),
+]
+MODULES = [
+    ("101", "MATHS", "87"),
+    ("101", "ENGLISH", "64"),
+    ("102", "MATHS", "55"),
+    ("103", "HISTORY", "91"),
+]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Flat CSV files as the app ships them, and an empty data directory."""
+    with open(tmp_path / "students.csv", "w") as f:
+        f.write("student_id,name,age,course,phone\n")
+        f.writelines(",".join(row) + "\n" for row in STUDENTS)
+    with open(tmp_path / "modules.csv", "w") as f:
+        f.write("student_id,module_name,grade\n")
+        f.writelines(",".join(row) + "\n" for row in MODULES)
+    return tmp_path
+
+
+def open_db(path, **kwargs):
+    return Database(str(path / "students.csv"), str(path / "modules.csv"), str(path / "data"),
+                    grading_file=None, **kwargs)
+
+
+def test_save_and_load_round_trip(data_dir):
+    db = open_db(data_dir)
+    assert db.save_data()
+    assert db.add_student("104", "DAN", 23, "BA", "0991000004")
+    assert db.add_module("104", "MATHS", 72.0)
+    assert db.update_module_grade("101", "ENGLISH", 70.0)
+    assert db.delete_student("102")
+
+    reloaded = open_db(data_dir)
+    assert sorted(reloaded.get_students()) == sorted(db.get_students())
+    assert reloaded.modules == db.modules
+    assert reloaded.get_module_students("maths") == db.get_module_students("MATHS")
+    manifest = json.load(open(data_dir / "data" / "manifest.json"))
+    assert manifest["change_seq"] == reloaded.change_seq == 4
+    # Only the files named by the manifest are left behind
+    shard_files = {name for files in manifest["files"].values() for name in files.values()}
+    assert shard_files == {name for name in os.listdir(data_dir / "data") if name.endswith(".csv")}
+
+
+def test_flat_files_are_only_read_until_migrated(data_dir):
+    db = open_db(data_dir)
+    db.add_student("104", "DAN", 23, "BA", "0991000004")
+    os.remove(data_dir / "students.csv")
+    assert "101" in open_db(data_dir).students
+
+
+def test_shard_count_grows_with_the_data(data_dir):
+    db = open_db(data_dir, shard_count=1, rows_per_shard=1)
+    db.save_data()
+    assert db.shard_count == 3
+    db.add_student("104", "DAN", 23, "BA", "0991000004")
+    db.add_student("105", "EVE", 24, "BA", "0991000005")
+    db.add_student("106", "FAY", 25, "BA", "0991000006")
+    db.add_student("107", "GUS", 26, "BA", "0991000007")
+    assert db.shard_count == 7
+    assert len(open_db(data_dir, shard_count=1, rows_per_shard=1).students) == 7
+
+
+def test_find_change_offset(data_dir):
+    db = open_db(data_dir)
+    for grade in range(10):
+        db.update_module_grade("101", "MATHS", float(grade))
+
+    with open(db.changes_file, "rb") as f:
+        lines = f.readlines()
+        starts = [sum(len(line) for line in lines[:i]) for i in range(len(lines) + 1)]
+        for seq in range(1, 12):
+            assert db.find_change_offset(f, "seq", seq) == starts[seq - 1]
+    assert [change["grade"] for change in db.get_changes(since_seq=7)] == [7.0, 8.0, 9.0]
+
+
+def test_since_time_includes_the_whole_second(data_dir):
+    db = open_db(data_dir)
+    db.add_module("102", "ENGLISH", 60.0)
+    second = db.get_changes()[0]["time"][:19] + "Z"
+    assert len(db.get_changes(since_time=second)) == 1
+
+
+def test_uncommitted_changes_are_dropped(data_dir):
+    db = open_db(data_dir)
+    db.add_module("102", "ENGLISH", 60.0)
+    # A crash after appending to the feed but before the manifest commit
+    with open(db.changes_file, "a") as f:
+        f.write(json.dumps({"seq": 2, "time": "", "op": "student_deleted", "student_id": "101"}) + "\n")
+
+    reloaded = open_db(data_dir)
+    assert reloaded.change_seq == 1
+    assert [change["seq"] for change in reloaded.get_changes()] == [1]
+
+
+def test_snapshot_after_mutations(data_dir):
+    db = open_db(data_dir)
+    before = sorted(db.get_students())
+    modules_101 = list(db.get_modules("101"))
+    assert db.create_snapshot("sem1")
+
+    db.update_module_grade("101", "MATHS", 40.0)
+    db.set_module_grades("MATHS", {"101": 45.0, "103": 50.0})
+    db.delete_student("102")
+    db.add_student("104", "DAN", 23, "BA", "0991000004")
+
+    for snapshot in (db.get_snapshot("sem1"), open_db(data_dir).get_snapshot("sem1")):
+        assert sorted(snapshot.get_students()) == before
+        assert snapshot.get_modules("101") == modules_101
+        assert snapshot.get_modules("102") == [("MATHS", 55.0)]
+        assert snapshot.get_modules("104") == []
+
+    # Each student is only copied once, however often they change
+    with open(os.path.join(db.snapshots_dir, "sem1.jsonl")) as f:
+        assert len(f.readlines()) == 1 + 4
+
+
+def test_archive_and_restore(data_dir):
+    db = open_db(data_dir)
+    modules = list(db.get_modules("101"))
+    assert db.archive_student("101", "graduated")
+    assert "101" not in db.students
+    assert db.find_student("101")[-1] == "graduated"
+    assert not db.add_student("101", "NEW", 18, "BSC", "0991000009")
+
+    reloaded = open_db(data_dir)
+    assert "101" not in reloaded.students
+    assert [record["student_id"] for record in reloaded.search_archive("10")] == ["101"]
+    assert reloaded.restore_student("101")
+    assert reloaded.get_modules("101") == modules
+    assert reloaded.get_archived("101") is None
+
+    restored = open_db(data_dir)
+    assert restored.find_student("101") == ("101", "ALICE", 20, "BSC", "0991000001", "active")
+    assert [change["op"] for change in restored.get_changes()] == ["student_archived", "student_restored"]
+
+
+def test_edits_are_refused_while_loading(data_dir):
+    open_db(data_dir).save_data()
+    db = open_db(data_dir, autoload=False)
+    db.begin_load()
+    assert not db.add_student("104", "DAN", 23, "BA", "0991000004")
+    assert not db.delete_student("101")
+    assert db.set_module_grades("MATHS", {"101": 10.0}) == 0
+    assert not db.archive_student("101")
+
+
+def test_export_skips_uncommitted_and_torn_changes(data_dir):
+    db = open_db(data_dir)
+    db.add_module("102", "ENGLISH", 60.0)
+    # A crash after appending to the feed, then one mid-append
+    with open(db.changes_file, "a") as f:
+        f.write(json.dumps({"seq": 2, "time": "", "op": "student_deleted", "student_id": "101"}) + "\n")
+        f.write('{"seq": 3, "ti')
+
+    reader = open_db(data_dir, autoload=False)
+    assert [change["seq"] for change in reader.get_changes()] == [1]
+    assert reader.get_changes(since_seq=1) == []
+    assert reader.export_changes(str(data_dir / "export.csv")) == 1
+
+
+def test_failed_save_is_retried_with_its_feed_entries(data_dir, monkeypatch):
+    db = open_db(data_dir)
+    db.save_data()
+    monkeypatch.setattr("app.messagebox.showerror", lambda *args: None)
+    with monkeypatch.context() as patched:
+        patched.setattr("app.os.replace", lambda *args: (_ for _ in ()).throw(IOError("disk full")))
+        assert not db.update_module_grade("101", "MATHS", 70.0)
+    assert db.get_changes() == []
+
+    assert db.add_module("103", "DS", 65.0)
+    assert [(change["op"], change["student_id"]) for change in db.get_changes()] == [
+        ("grade_updated", "101"), ("module_added", "103")]
+    reloaded = open_db(data_dir)
+    assert ("MATHS", 70.0) in reloaded.get_modules("101")
+
+
+def test_failed_archive_keeps_the_student_active(data_dir, monkeypatch):
+    db = open_db(data_dir)
+    db.save_data()
+    modules = list(db.get_modules("101"))
+    monkeypatch.setattr("app.messagebox.showerror", lambda *args: None)
+    with monkeypatch.context() as patched:
+        patched.setattr("app.os.replace", lambda *args: (_ for _ in ()).throw(IOError("disk full")))
+        assert not db.archive_student("101")
+    assert db.get_modules("101") == modules
+    assert db.get_archived("101") is None and db.pending_changes == []
+
+    reloaded = open_db(data_dir)
+    assert reloaded.find_student("101")[-1] == "active"
+    assert reloaded.get_archived("101") is None
+    assert reloaded.get_changes() == []
+
+
+def test_bulk_grades_log_new_modules_as_added(data_dir):
+    db = open_db(data_dir)
+    assert db.set_module_grades("maths", {"101": 90.0, "103": 40.0}) == 2
+    assert [(change["op"], change["student_id"]) for change in db.get_changes()] == [
+        ("grade_updated", "101"), ("module_added", "103")]
+    assert db.get_modules("101")[0] == ("MATHS", 90.0)
+    assert ("maths", 40.0) in db.get_modules("103")
+
+
+def test_deleting_an_unknown_student_writes_nothing(data_dir):
+    db = open_db(data_dir)
+    db.save_data()
+    generation = db.save_generation
+    assert not db.delete_student("999")
+    assert db.save_generation == generation and not db.dirty
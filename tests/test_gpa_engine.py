@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gpa_engine import GpaEngine, GradingScale
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_grade_points_follow_the_bands():
+    scale = GradingScale("test", [[0, 0.0], [60, 1.0], [70, 2.0], [80, 3.0], [90, 4.0]])
+    assert [scale.grade_points(mark) for mark in (-1, 0, 59.9, 60, 79, 80, 100)] == [0, 0, 0, 1, 2, 3, 4]
+
+
+def test_gpa_is_credit_weighted():
+    scale = GradingScale("test", [[0, 0.0], [50, 2.0], [80, 4.0]], credits={"maths": 3})
+    assert scale.gpa([("MATHS ", 85), ("ENGLISH", 55)]) == 3.5
+    assert scale.gpa([]) == 0.0
+
+
+def test_shipped_config_matches_the_original_scale():
+    engine = GpaEngine(os.path.join(REPO, "grading_scales.json"))
+    modules = [("MATHS", 87.0), ("ENGLISH", 98.0), ("SOFT SKILLS", 82.0)]
+    assert engine.calculate(modules) == GpaEngine(None).calculate(modules) == 3.33
+    engine.use_scale("four_point_plus")
+    assert engine.calculate([("MATHS", 55.0)]) == 2.7
+
+
+def test_calculate_many_matches_calculate():
+    engine = GpaEngine(None)
+    students = {"a": [("X", 95.0)], "b": [("X", 61.0), ("Y", 72.0)], "c": []}
+    assert engine.calculate_many(students) == {key: engine.calculate(value) for key, value in students.items()}
+
+
+def test_missing_file_falls_back_to_the_built_in_scale(tmp_path):
+    assert GpaEngine(str(tmp_path / "missing.json")).scale.name == "four_point"
+
+
+@pytest.mark.parametrize("config", [
+    "not json",
+    [1, 2],
+    {"scales": 5},
+    {"scales": {"x": 5}},
+    {"scales": {"x": {"bands": 5}}},
+    {"scales": {"x": {"bands": [[90, 4.0, 1]]}}},
+    {"scales": {"x": {"bands": [["ninety", 4.0]]}}},
+    {"scales": {"x": {"bands": [[0, 0.0]], "credits": [1]}}},
+    {"scales": {}},
+    {"default": "y", "scales": {"x": {"bands": [[0, 0.0]]}}},
+])
+def test_malformed_config_raises_value_error(tmp_path, config):
+    path = tmp_path / "scales.json"
+    path.write_text(config if isinstance(config, str) else json.dumps(config))
+    with pytest.raises(ValueError):
+        GpaEngine(str(path))
+
+
+def test_unknown_scale_is_rejected():
+    with pytest.raises(ValueError):
+        GpaEngine(None).use_scale("nope")
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import Database, RowValidator
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A loaded Database that never touches the disk."""
+    db = Database(str(tmp_path / "students.csv"), str(tmp_path / "modules.csv"), str(tmp_path / "data"),
+                  grading_file=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                            "grading_scales.json"),
+                  autoload=False)
+    db.begin_load()
+    db.apply_batch("students", [("1", "A", 20, "BSC", "0990000001"), ("2", "B", 21, "BSC", "0990000002"),
+                                ("3", "C", 22, "BA", "0990000003")])
+    db.apply_batch("modules", [("1", "Maths", 87.0), ("2", "MATHS ", 55.0), ("2", "OS", 40.0), ("3", "maths", 65.0)])
+    db.finish_load(None, {}, RowValidator())
+    db.save_data = lambda changes=(): True
+    return db
+
+
+def rebuilt_index(db):
+    index = {}
+    for student_id, modules in db.modules.items():
+        for module_name, grade in modules:
+            index.setdefault(db.normalise_module(module_name), {}).setdefault(student_id, []).append(grade)
+    return index
+
+
+def test_module_names_are_matched_regardless_of_case_and_spacing(db):
+    assert db.get_module_names() == ["MATHS", "OS"]
+    assert sorted(db.get_module_students(" maths")) == [("1", 87.0), ("2", 55.0), ("3", 65.0)]
+    assert db.get_module_average("Maths") == 69.0
+    assert db.get_module_students("PHYSICS") == [] and db.get_module_average("PHYSICS") == 0.0
+
+
+def test_index_follows_every_kind_of_edit(db):
+    db.add_module("1", "OS", 70.0)
+    db.update_module_grade("2", "OS", 45.0)
+    db.delete_module("3", "maths")
+    db.set_module_grades("Physics", {"1": 50.0, "3": 80.0})
+    db.delete_student("2")
+    db.add_student("4", "D", 19, "BA", "0990000004")
+    db.add_module("4", "OS", 99.0)
+    assert db.module_index == rebuilt_index(db)
+    assert "2" not in db.module_index["OS"]
+
+
+def test_failures_use_the_pass_mark_of_the_grading_scale(db):
+    assert db.get_module_failures("MATHS") == [("2", 55.0)]
+    db.set_grading_scale("four_point_plus")
+    assert db.get_module_failures("MATHS") == []
+    assert db.get_module_failures("OS") == [("2", 40.0)]
+    assert db.get_module_failures("MATHS", pass_mark=70) == [("2", 55.0), ("3", 65.0)]
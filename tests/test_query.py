@@ -0,0 +1,97 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import Database, Or, RowValidator, TookModule, Where
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A loaded Database that never touches the disk."""
+    db = Database(str(tmp_path / "students.csv"), str(tmp_path / "modules.csv"), str(tmp_path / "data"),
+                  grading_file=None, autoload=False)
+    db.begin_load()
+    db.apply_batch("students", [(f"S{i}", f"NAME{i}", 18 + i % 10, ["BSC", "BA", "MSC"][i % 3], f"09{i:08d}")
+                                for i in range(300)])
+    db.apply_batch("modules", [(f"S{i}", "MATHS", float(i % 100)) for i in range(300)]
+                   + [(f"S{i}", "OS", 50.0) for i in range(0, 300, 50)])
+    db.finish_load(None, {}, RowValidator())
+    db.save_data = lambda changes=(): True
+    return db
+
+
+def brute_force(db, predicate):
+    return sorted(student_id for student_id in db.students if predicate.matches(db, student_id))
+
+
+def test_planner_picks_the_most_selective_index(db):
+    predicate = Where("course", "==", "bsc") & TookModule("os") & Where("age", ">", 20)
+    plan = db.explain(predicate)
+    assert plan["index"] == "module"
+    assert plan["estimated_rows"] == 6
+    assert plan["filters"] == ["course == 'bsc'", "age > 20"]
+    assert sorted(row[0] for row in db.query(predicate)) == brute_force(db, predicate)
+
+
+def test_unindexed_predicates_fall_back_to_a_full_scan(db):
+    predicate = Where("name", "contains", "name1") | Where("age", "<", 19)
+    assert db.explain(predicate)["index"] == "full scan"
+    assert sorted(row[0] for row in db.query(predicate)) == brute_force(db, predicate)
+
+
+def test_or_of_indexed_parts_uses_both_indexes(db):
+    predicate = Or(Where("id", "==", "S7"), TookModule("os", "<", 60))
+    assert db.explain(predicate)["index"] == "id+module"
+    assert sorted(row[0] for row in db.query(predicate)) == brute_force(db, predicate)
+
+
+def test_explain_does_not_build_the_gpa_ordering(db):
+    plan = db.explain(Where("id", "==", "S5") & Where("gpa", "<", 2))
+    assert plan["index"] == "id"
+    assert db.gpa_order is None
+
+
+def test_gpa_ordering_follows_edits(db):
+    predicate = Where("gpa", ">=", 3) & Where("course", "==", "MSC")
+    assert sorted(row[0] for row in db.query(Where("gpa", ">=", 3))) == brute_force(db, Where("gpa", ">=", 3))
+    db.update_module_grade("S1", "MATHS", 95.0)
+    db.set_module_grades("MATHS", {"S2": 99.0, "S3": 10.0})
+    db.add_student("NEW", "NEW", 20, "MSC", "0800000000")
+    db.add_module("NEW", "MATHS", 100.0)
+    db.delete_student("S99")
+    assert db.gpa_order == sorted((db.gpa_engine.calculate(db.modules[student_id]), student_id)
+                                  for student_id in db.students)
+    assert sorted(row[0] for row in db.query(predicate)) == brute_force(db, predicate)
+
+
+def test_select_is_cached_until_the_data_changes(db):
+    predicate = Where("course", "==", "MSC")
+    first = db.select(predicate, sort="name", page=0, page_size=10)
+    plan = db.last_plan
+    db.last_plan = None
+    assert db.select(predicate, sort="name", page=0, page_size=10) is first
+    assert db.last_plan is plan and plan["index"] == "course"
+    assert db.query_cache_stats == {"hits": 1, "misses": 1, "evictions": 0}
+
+    student_id = first[0][0]
+    db.update_module_grade(student_id, "MATHS", 99.0)
+    second = db.select(predicate, sort="name", page=0, page_size=10)
+    assert second is not first and db.query_cache_stats["misses"] == 2
+    by_name = sorted(brute_force(db, predicate), key=lambda student_id: db.students[student_id][0])
+    assert [row[0] for row in second] == by_name[:10]
+    assert second[0][5] == db.calculate_gpa(student_id) != first[0][5]
+
+
+def test_select_evicts_the_least_recently_used_query(db):
+    db.query_cache_size = 2
+    db.select(Where("age", "==", 18))
+    db.select(Where("age", "==", 19))
+    db.select(Where("age", "==", 18))
+    db.select(Where("age", "==", 20))  # evicts age == 19
+    assert db.query_cache_stats["evictions"] == 1
+    db.select(Where("age", "==", 18))
+    db.select(Where("age", "==", 19))
+    assert db.query_cache_stats == {"hits": 2, "misses": 4, "evictions": 2}
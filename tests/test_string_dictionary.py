@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import Database, StringDictionary
+
+
+def copy(value):
+    return "".join(list(value))  # An equal string that isn't the same object
+
+
+def test_equal_values_share_a_code_and_a_copy():
+    strings = StringDictionary()
+    first = copy("COMPUTER SCIENCE")
+    assert strings.encode(first) == strings.encode(copy("COMPUTER SCIENCE")) == 0
+    assert strings.encode("BA") == 1
+    assert strings.intern(copy("COMPUTER SCIENCE")) is first
+    assert strings.values == [first, "BA"]
+
+
+def test_values_differing_by_case_share_a_fold_code():
+    strings = StringDictionary()
+    codes = [strings.encode(value) for value in ("Maths", "MATHS", "OS")]
+    assert codes == [0, 1, 2]
+    assert strings.folds == [0, 0, 1]
+    assert strings.fold_of("maths") == 0 and strings.fold_of("os") == 1
+    assert strings.fold_of("history") == -1
+
+
+def test_bytes_released_counts_only_duplicate_copies():
+    strings = StringDictionary()
+    value = copy("BSC")
+    strings.encode(value)
+    strings.encode(value)
+    assert strings.bytes_released == 0
+    strings.encode(copy("BSC"))
+    strings.encode(copy("BSC"))
+    assert strings.bytes_released == 2 * sys.getsizeof(value)
+    assert strings.overhead() > 0
+
+
+def test_load_report_nets_the_code_tables_out_of_the_savings(tmp_path):
+    with open(tmp_path / "students.csv", "w") as f:
+        f.write("student_id,name,age,course,phone\n")
+        f.writelines(f"{i},NAME{i},20,BSC,09{i:08d}\n" for i in range(50))
+    with open(tmp_path / "modules.csv", "w") as f:
+        f.write("student_id,module_name,grade\n")
+        f.writelines(f"{i},MATHS,60\n" for i in range(50))
+    db = Database(str(tmp_path / "students.csv"), str(tmp_path / "modules.csv"), str(tmp_path / "data"),
+                  grading_file=None)
+    report = db.load_report
+    assert len(db.courses.values) == len(db.module_names.values) == 1
+    assert report["bytes_released"] == db.courses.bytes_released + db.module_names.bytes_released > 0
+    assert report["bytes_saved"] == report["bytes_released"] - db.encoding_overhead()
+    assert len({id(student[2]) for student in db.students.values()}) == 1
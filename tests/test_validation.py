@@ -0,0 +1,105 @@
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import Database, RowValidator
+
+
+def test_student_rows_are_checked_in_one_pass():
+    validator = RowValidator(student_ids=["1"], phones={"0990000001": "1"}, archived_ids={"9"})
+    rows = [
+        ["2", "B", "20", "BSC", "0990000002"],
+        ["1", "A", "20", "BSC", "0990000011"],
+        ["3", "C", "20", "BSC", "0990000001"],
+        ["4", "D", "old", "BSC", "0990000004"],
+        ["5", "E", "0", "BSC", "0990000005"],
+        ["", "F", "20", "BSC", "0990000006"],
+        ["7", "G"],
+        ["2", "B again", "20", "BSC", "0990000007"],
+        ["9", "Archived", "20", "BSC", "0990000009"],
+    ]
+    checked = [validator.check_student("s.csv", line, row) for line, row in enumerate(rows, 2)]
+    assert checked[0] == ("2", "B", 20, "BSC", "0990000002")
+    assert checked[1:] == [None] * 8
+    assert [(line, reason) for _, line, reason, _ in validator.rejects] == [
+        (3, "duplicate student_id"),
+        (4, "phone already used by student 1"),
+        (5, "invalid age"),
+        (6, "invalid age"),
+        (7, "empty student_id"),
+        (8, "missing fields"),
+        (9, "duplicate student_id"),
+        (10, "student_id belongs to an archived student"),
+    ]
+    assert validator.rows_checked == 9
+
+
+def test_module_rows_need_a_known_student_and_a_valid_grade():
+    validator = RowValidator(student_ids=["1"])
+    assert validator.check_module("m.csv", 2, ["1", "MATHS", "87"]) == ("1", "MATHS", 87.0)
+    for row in (["2", "MATHS", "87"], ["1", " ", "87"], ["1", "MATHS", "101"], ["1", "MATHS", "A"], ["1"]):
+        assert validator.check_module("m.csv", 3, row) is None
+    assert [reason for _, _, reason, _ in validator.rejects] == [
+        "unknown student_id", "empty module name", "invalid grade", "invalid grade", "missing fields"]
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def test_bad_rows_are_quarantined_once_with_their_fields(tmp_path):
+    write_csv(tmp_path / "students.csv", ["student_id", "name", "age", "course", "phone"],
+              [["1", "Doe, Jane", "x", "BSC", "0990000001"], ["2", "Bob", "20", "BSC", "0990000002"]])
+    write_csv(tmp_path / "modules.csv", ["student_id", "module_name", "grade"],
+              [["1", "MATHS", "50"], ["2", "MATHS", "150"], ["2", "OS", "60"]])
+    paths = (str(tmp_path / "students.csv"), str(tmp_path / "modules.csv"), str(tmp_path / "data"))
+
+    db = Database(*paths, grading_file=None)
+    assert list(db.students) == ["2"] and db.modules == {"2": [("OS", 60.0)]}
+    assert db.load_report["rejected"] == 3
+    Database(*paths, grading_file=None)  # Still not migrated, so the same rows are rejected again
+
+    with open(db.rejects_file, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["detected_at", "source", "line", "reason", "fields"]
+    assert [row[1:] for row in rows[1:]] == [
+        [paths[0], "2", "invalid age", "1", "Doe, Jane", "x", "BSC", "0990000001"],
+        [paths[1], "2", "unknown student_id", "1", "MATHS", "50"],
+        [paths[1], "3", "invalid grade", "2", "MATHS", "150"],
+    ]
+
+
+def test_import_rejects_clashes_with_existing_students(tmp_path):
+    write_csv(tmp_path / "students.csv", ["student_id", "name", "age", "course", "phone"],
+              [["1", "A", "20", "BSC", "0990000001"]])
+    write_csv(tmp_path / "modules.csv", ["student_id", "module_name", "grade"], [])
+    db = Database(str(tmp_path / "students.csv"), str(tmp_path / "modules.csv"), str(tmp_path / "data"),
+                  grading_file=None)
+    write_csv(tmp_path / "new_students.csv", ["student_id", "name", "age", "course", "phone"],
+              [["1", "Dup", "20", "BSC", "0990000009"], ["2", "Phone", "20", "BSC", "0990000001"],
+               ["3", "New", "20", "BA", "0990000003"]])
+    write_csv(tmp_path / "new_modules.csv", ["student_id", "module_name", "grade"],
+              [["3", "MATHS", "70"], ["1", "OS", "50"]])
+
+    result = db.import_csv(str(tmp_path / "new_students.csv"), str(tmp_path / "new_modules.csv"))
+    assert result == (1, 2, 2)
+    assert sorted(db.students) == ["1", "3"] and db.get_modules("3") == [("MATHS", 70.0)]
+    assert db.get_modules("1") == [("OS", 50.0)]
+    assert [change["op"] for change in db.get_changes()] == ["student_added", "module_added", "module_added"]
+
+
+def test_undecodable_file_is_reported_not_raised(tmp_path, monkeypatch):
+    errors = []
+    monkeypatch.setattr("app.messagebox.showerror", lambda title, message: errors.append(message))
+    (tmp_path / "students.csv").write_bytes(b"student_id,name,age,course,phone\n1,Jos\xe9,20,BSC,0990000001\n")
+    (tmp_path / "modules.csv").write_text("student_id,module_name,grade\n")
+    db = Database(str(tmp_path / "students.csv"), str(tmp_path / "modules.csv"), str(tmp_path / "data"),
+                  grading_file=None)
+    assert not db.loading
+    assert db.import_csv(str(tmp_path / "students.csv")) == (0, 0, 0)
+    assert len(errors) == 2